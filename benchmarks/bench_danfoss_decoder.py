@@ -0,0 +1,121 @@
+"""
+Compare the xmltodict decoding path against bms.DanfossXMLDecoder for the
+Danfoss bulk point reads.
+
+Usage:
+    python benchmarks/bench_danfoss_decoder.py [captures_dir] [--points N]
+
+captures_dir may contain captured responses named after their action, e.g.
+read_sensor.xml or read_monitor_detail_panel01.xml. Without it, synthetic
+responses of N points per action are generated.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import xmltodict as xtd
+from bms.DanfossXMLDecoder import ADDRESS_KEYS, POINT_RESPONSES, decode_point_response
+
+
+def synthetic_response(action: str, points: int) -> str:
+    tag, nodetype = POINT_RESPONSES[action]
+    rows = []
+    for i in range(points):
+        node, point = divmod(i, 32)
+        if nodetype is None:
+            rows.append(
+                f'<monitor nodetype="2" node="{node + 1}" mod="0" point="{point + 1}" '
+                f'alarm_id="{i}" cutout="-25.0" cutin="-18.5" delay="30" '
+                f'enabled="1" name="Case {i} Discharge" units="F"/>'
+            )
+        else:
+            rows.append(
+                f'<{tag} node="{node + 1}" mod="0" point="{point + 1}" '
+                f'name="Case {i} Discharge" units="F" status="0" type="1">'
+                f"{(i % 400) / 10 - 10:.1f}</{tag}>"
+            )
+    return f'<resp action="{action}" total="{points}">{"".join(rows)}</resp>'
+
+
+def xmltodict_path(action: str, text: str) -> list[dict]:
+    """The pre-decoder path: xmltodict plus DanfossBox's own record copies."""
+    tag, nodetype = POINT_RESPONSES[action]
+    resp_s = xtd.parse(text)["resp"].get(tag)
+    if resp_s is None:
+        return []
+    elif not isinstance(resp_s, list):
+        resp_s = [resp_s]
+
+    records = []
+    for s in resp_s:
+        if nodetype is not None:
+            s["@nodetype"] = nodetype
+            records.append(s)
+        else:
+            sx = {k: v for k, v in s.items() if k in ADDRESS_KEYS}
+            sx["monitor"] = {k: v for k, v in s.items() if k not in ADDRESS_KEYS}
+            records.append(sx)
+    return records
+
+
+def decoder_path(action: str, text: str) -> list[dict]:
+    return decode_point_response(action, text)[POINT_RESPONSES[action][0]]
+
+
+def measure(func, action: str, text: str, repeat: int) -> tuple[float, int, int]:
+    start = time.process_time()
+    for _ in range(repeat):
+        func(action, text)
+    cpu = (time.process_time() - start) / repeat
+
+    tracemalloc.start()
+    records = func(action, text)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return cpu, peak, retained
+
+
+def load_responses(captures: Path | None, points: int) -> list[tuple[str, str, str]]:
+    if captures is None:
+        return [
+            (action, f"synthetic x{points}", synthetic_response(action, points))
+            for action in POINT_RESPONSES
+        ]
+
+    responses = []
+    for path in sorted(captures.glob("*.xml")):
+        action = next((a for a in POINT_RESPONSES if path.stem.startswith(a)), None)
+        if action is not None:
+            responses.append((action, path.name, path.read_text()))
+    return responses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("captures", nargs="?", type=Path)
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(
+        f"{'response':<36} {'path':<10} {'cpu ms':>8} {'peak KiB':>9} {'kept KiB':>9}"
+    )
+    for action, label, text in load_responses(args.captures, args.points):
+        assert xmltodict_path(action, text) == decoder_path(action, text)
+        for name, func in (("xmltodict", xmltodict_path), ("decoder", decoder_path)):
+            cpu, peak, retained = measure(func, action, text, args.repeat)
+            print(
+                f"{action + ' ' + label:<36} {name:<10} {cpu * 1000:>8.2f} "
+                f"{peak / 1024:>9.0f} {retained / 1024:>9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Compare cycle time and request count of the Danfoss nodetype 0-3 reads with
+and without the read_points_si bulk snapshot (danfoss_bulk_snapshot).
+
+Usage:
+    python benchmarks/bench_danfoss_snapshot.py [captures_dir] [--points N]
+        [--latency S] [--seconds-per-kib S]
+
+captures_dir may contain recorded responses named after their action:
+read_input.xml, read_relay.xml, read_sensor.xml, read_var_out.xml and
+read_points_si.xml. Point reads are replayed filtered to the requested
+addresses. Without it, a synthetic site of N points per nodetype is used.
+Each replayed request costs a fixed latency plus a per-KiB transfer time.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import xmltodict as xtd
+import core
+from bms.DanfossBox import DanfossBox, POINT_NODETYPES
+from bms.DanfossXMLDecoder import ADDRESS_KEYS, POINT_RESPONSES, decode_point_response
+from bench_danfoss_decoder import synthetic_response
+
+
+def synthetic_snapshot(points: int) -> str:
+    # In the units and with the attributes of synthetic_response; nodetypes
+    # in other units or with fewer attributes are not covered
+    rows = []
+    for nodetype_id, *_ in POINT_NODETYPES:
+        for i in range(points):
+            node, point = divmod(i, 32)
+            rows.append(
+                f'<point nodetype="{nodetype_id}" node="{node + 1}" mod="0" '
+                f'point="{point + 1}" name="Case {i} Discharge" units="F" '
+                f'status="0" type="1">{(i % 400) / 10 - 10:.1f}</point>'
+            )
+    return f'<resp action="read_points_si">{"".join(rows)}</resp>'
+
+
+def load_site(captures: Path | None, points: int) -> dict[str, str]:
+    if captures is None:
+        site = {
+            action: synthetic_response(action, points)
+            for _, action, _ in POINT_NODETYPES
+        }
+        site["read_points_si"] = synthetic_snapshot(points)
+        return site
+    return {path.stem: path.read_text() for path in sorted(captures.glob("*.xml"))}
+
+
+class ReplayInterface:
+    """Stands in for DanfossXMLInterface, serving recorded responses."""
+
+    def __init__(self, site: dict[str, str], latency: float, per_kib: float):
+        self.ip = "replay"
+        self.timeout = 3
+        self.max_concurrent_requests = 2
+        self.breaker = core.CircuitBreaker("replay")
+        self.site = site
+        self.latency = latency
+        self.per_kib = per_kib
+        self.requests = 0
+        self.slots = asyncio.Semaphore(self.max_concurrent_requests)
+
+        self.records: dict[str, dict[tuple, dict]] = {}
+        for action, text in site.items():
+            if action in POINT_RESPONSES:
+                tag = POINT_RESPONSES[action][0]
+                self.records[action] = {
+                    tuple(r[k] for k in ADDRESS_KEYS[1:]): r
+                    for r in decode_point_response(action, text)[tag]
+                }
+
+    def __getattr__(self, action):
+        async def command(*args, **kwargs):
+            async with self.slots:
+                self.requests += 1
+                resp, size = self.respond(action, *args)
+                elapsed = self.latency + size / 1024 * self.per_kib
+                await asyncio.sleep(elapsed)
+                core.report_response(elapsed, size)
+            return resp
+
+        return command
+
+    def respond(self, action: str, addresses=None) -> tuple[dict, int]:
+        if action not in self.site:
+            return {"@action": action, "@error": "unknown action"}, 64
+
+        text = self.site[action]
+        if action not in self.records:
+            return xtd.parse(text)["resp"], len(text)
+
+        recorded = self.records[action]
+        keys = [(str(a["node"]), str(a["mod"]), str(a["point"])) for a in addresses]
+        records = [dict(recorded[k]) for k in keys if k in recorded]
+        size = len(text) * len(records) // max(len(recorded), 1)
+        return {POINT_RESPONSES[action][0]: records}, size
+
+
+async def run_cycle(site: dict[str, str], snapshot: bool, args) -> tuple[float, int]:
+    box = DanfossBox("replay", "replay")
+    interface = ReplayInterface(site, args.latency, args.seconds_per_kib)
+    box.xml_interface = interface
+    box.bulk_snapshot = snapshot
+    for records in interface.records.values():
+        box.merge_points(dict(r) for r in records.values())
+
+    # The first cycle settles chunk sizes, snapshot support and the attributes
+    # the snapshot has to carry
+    await box.update_point_nodetypes()
+    interface.requests = 0
+    start = time.perf_counter()
+    await box.update_point_nodetypes()
+    return time.perf_counter() - start, interface.requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("captures", nargs="?", type=Path)
+    parser.add_argument("--points", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--seconds-per-kib", type=float, default=0.002)
+    args = parser.parse_args()
+
+    site = load_site(args.captures, args.points)
+    print(f"{'mode':<20} {'cycle s':>8} {'requests':>9}")
+    for name, snapshot in (("per nodetype", False), ("read_points_si", True)):
+        elapsed, requests = asyncio.run(run_cycle(site, snapshot, args))
+        print(f"{name:<20} {elapsed:>8.2f} {requests:>9}")
+
+
+if __name__ == "__main__":
+    main()
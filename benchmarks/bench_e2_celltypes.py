@@ -0,0 +1,113 @@
+"""
+Measure what the E2 celltype map costs at startup: importing the packed
+bms.E2Celltypes table against the former column-per-dict literal, and the
+one-off parse into a CelltypeIndex on first E2 use.
+
+Usage:
+    python benchmarks/bench_e2_celltypes.py [--runs N]
+
+The legacy layout is regenerated from the packed table into a temporary
+module. Both are loaded straight from their files (skipping the bms package
+imports) from cached bytecode in fresh interpreters.
+"""
+
+import argparse
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+PACKED = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../src/bms/E2Celltypes.py")
+)
+
+IMPORT_TIMER = """
+import importlib.util, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("celltypes", {path!r})
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+print(time.perf_counter() - start)
+"""
+
+
+def load(path: str):
+    spec = importlib.util.spec_from_file_location("celltypes", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+E2Celltypes = load(PACKED)
+CELLTYPE_TABLE, CelltypeIndex = E2Celltypes.CELLTYPE_TABLE, E2Celltypes.CelltypeIndex
+
+
+def legacy_module(directory: Path) -> None:
+    """Write the table as the celltype/property_index/property_name dicts."""
+    rows = [line.split("\t") for line in CELLTYPE_TABLE.splitlines()]
+    lines = ["CELLTYPE_MAPPINGS = {"]
+    for column, key in enumerate(("celltype", "property_index", "property_name")):
+        lines.append(f"    {key!r}: {{")
+        lines += [f"        {i}: {row[column]!r}," for i, row in enumerate(rows)]
+        lines.append("    },")
+    lines.append("}")
+    lines.append(
+        "PROPERTIES, NAMES = {}, {}\n"
+        "for r, c in CELLTYPE_MAPPINGS['celltype'].items():\n"
+        "    i = CELLTYPE_MAPPINGS['property_index'][r]\n"
+        "    PROPERTIES.setdefault(c, []).append(i)\n"
+        "    NAMES[(c, i)] = CELLTYPE_MAPPINGS['property_name'][r]\n"
+    )
+    (directory / "legacy_celltypes.py").write_text("\n".join(lines))
+
+
+def import_seconds(path: str, runs: int) -> float:
+    code = IMPORT_TIMER.format(path=path)
+    # The first run compiles and caches the bytecode
+    subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+    samples = [
+        float(
+            subprocess.run(
+                [sys.executable, "-c", code], check=True, capture_output=True, text=True
+            ).stdout
+        )
+        for _ in range(runs)
+    ]
+    return statistics.median(samples)
+
+
+def parse_cost() -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = CelltypeIndex(CELLTYPE_TABLE)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(index) == len(CELLTYPE_TABLE.splitlines())
+    return elapsed, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=11)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_module(Path(tmp))
+        legacy = import_seconds(str(Path(tmp) / "legacy_celltypes.py"), args.runs)
+    packed = import_seconds(PACKED, args.runs)
+    parse, size = parse_cost()
+
+    print(f"{'step':<28} {'ms':>8}")
+    print(f"{'import legacy dicts':<28} {legacy * 1000:>8.2f}")
+    print(f"{'import packed table':<28} {packed * 1000:>8.2f}")
+    print(f"{'first use: build index':<28} {parse * 1000:>8.2f}")
+    print(f"index size: {size / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compare the former E2 response parsing (json.loads, then a regex repair over
+the whole body and json.loads again) against bms.E2JSONDecoder on good and
+malformed GetMultiExpandedStatus responses.
+
+Usage:
+    python benchmarks/bench_e2_decoder.py [captures_dir] [--entries N]
+        [--defects N]
+
+captures_dir may contain captured response bodies (*.json), well-formed or
+not. Without it, a synthetic response of N entries is used as is and with
+N defects (unescaped quotes) spread through its second half.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from bms.E2JSONDecoder import decode_response
+
+
+def synthetic_response(entries: int, defects: int) -> tuple[str, str]:
+    data = [
+        {
+            "prop": f"RX-1:CASE {i // 40}:{i % 40}.0",
+            "alarm": False,
+            "bypasstime": "",
+            "dataType": "1",
+            "engUnits": "DF",
+            "fail": False,
+            "notice": False,
+            "override": False,
+            "ovtime": "",
+            "ovtype": "",
+            "value": f"{(i % 400) / 10 - 10:.1f}",
+        }
+        for i in range(entries)
+    ]
+    good = json.dumps({"id": 0, "result": {"data": data}})
+
+    bad = good
+    for n in range(defects):
+        i = entries // 2 + n * (entries // 2) // max(defects, 1)
+        prop = f"RX-1:CASE {i // 40}:{i % 40}.0"
+        defective = prop.replace("CASE", '12"CASE')
+        bad = bad.replace(f'"{prop}"', f'"{defective}"', 1)
+    return good, bad
+
+
+def legacy_path(text: str):
+    try:
+        return json.loads(text)
+    except:
+        fixed = re.sub(r'(?<=[A-Za-z0-9])"(?=[A-Za-z0-9])', "", text)
+        return json.loads(fixed)
+
+
+def decoder_path(text: str):
+    return decode_response(text)[0]
+
+
+def measure(func, text: str, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        func(text)
+    return (time.process_time() - start) / repeat
+
+
+def load_responses(captures: Path | None, entries: int, defects: int):
+    if captures is None:
+        good, bad = synthetic_response(entries, defects)
+        return [
+            (f"synthetic x{entries}", good),
+            (f"synthetic x{entries}, {defects} bad", bad),
+        ]
+    return [(path.name, path.read_text()) for path in sorted(captures.glob("*.json"))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("captures", nargs="?", type=Path)
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--defects", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'response':<36} {'path':<10} {'cpu ms':>8} {'repaired':>9}")
+    for label, text in load_responses(args.captures, args.entries, args.defects):
+        _, repaired = decode_response(text)
+        assert legacy_path(text) == decoder_path(text)
+        for name, func in (("legacy", legacy_path), ("decoder", decoder_path)):
+            cpu = measure(func, text, args.repeat)
+            print(f"{label:<36} {name:<10} {cpu * 1000:>8.2f} {len(repaired):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -282,13 +282,14 @@ class IoTDevice:
             ...
         ]
         Batches multiple devices into a single message, as long as total size < 230 KB.
+        Returns whether every batch was sent.
         """
         if not self.connected:
             await self.connect()
 
         if not self.connected:
             logger.warning("Could not send message to IoTHub: failure to connect.")
-            return
+            return False
 
         batch = []
         for device_data in data:
@@ -356,7 +357,7 @@ class IoTDevice:
                         logger.error(f"Could not send to IoTHub: {e}")
                         self.connected = False
                         self.watchdog.transition_function(False)
-                        return
+                        return False
                     batch = []
 
         # Send any remaining data
@@ -379,6 +380,8 @@ class IoTDevice:
             except Exception as e:
                 logger.error(f"Could not send final batch to IoTHub: {e}")
                 self.connected = False
+                return False
+        return True
 
     @check_valid_device
     async def disconnect(self):
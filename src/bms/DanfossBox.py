@@ -1,12 +1,20 @@
+from __future__ import annotations
 from .DanfossXMLInterface import DanfossXMLInterface
-from core import aobject
+from .DanfossXMLDecoder import ADDRESS_KEYS
+from core import AdaptiveChunker, ChunkAborted
 from rich.tree import Tree
 from rich import print as rprint
+import asyncio
 import logging
 import time
+import json
+import core
 
 logger = logging.getLogger(__name__)
 
+with open(core.GENERAL_SETTINGS, "r") as f:
+    general_settings = json.load(f)
+
 
 def logtimer(func):
     async def wrapper(*args, **kwargs):
@@ -24,7 +32,7 @@ class DanfossBox:
         self.ip = ip
         self.name = name
         self.initialized: bool = False
-        self.nodetypes: dict[str, Nodetype] = {}
+        self.points: PointIndex = PointIndex()
         self.hvacs: dict = {}  # Address table of ahindex: Point
         self.lighting: dict = {}  # Address table of index: Point
 
@@ -37,6 +45,32 @@ class DanfossBox:
         self.schedule_summary: dict = {}
         self.read_store_schedule: dict = {}
 
+        # Bulk point reads are chunked per nodetype (0-3)
+        self.chunk_size: int = general_settings.get("danfoss_chunk_size", 100)
+        self.chunkers: dict[str, AdaptiveChunker] = {}
+        # Scope: (point index version, addresses) of the last bulk read
+        self.address_lists: dict[str, tuple[int, list | None]] = {}
+
+        # Leak detector (device_num, zone_num): name, from the last full scan,
+        # and the leak devices last published
+        self.cs_topology: dict[tuple[int, int], str] | None = None
+        self.cs_devices: list[dict] = []
+        self.cs_last_scan: float = 0.0
+        self.cs_rescan_seconds: float = (
+            general_settings.get("danfoss_cs_rescan_minutes", 60) * 60
+        )
+
+        # Optional read_points_si snapshot replacing the nodetype 0-3 reads;
+        # None until the panel has shown whether it supports it
+        self.bulk_snapshot: bool = general_settings.get("danfoss_bulk_snapshot", False)
+        self.snapshot_supported: bool | None = None
+        # Nodetype: attributes its own point reads return. The snapshot only
+        # stands in for reads whose attributes it carries too.
+        self.read_attributes: dict[str, set[str]] = {}
+
+        # Alarm ref: state ("acked"/"active") of its last fetched alarm_detail
+        self.alarm_detail_cache: dict[str, str] = {}
+
     @logtimer
     async def initialize(self):
         logging.info(f"{self.name} is starting initial discovery")
@@ -55,14 +89,79 @@ class DanfossBox:
         self.initialized = True
         logging.info("Finished initial discovery")
 
-    async def add_nodetype(self, data: dict):
+    def merge_points(self, records) -> list[Point]:
+        """Upsert response records into the point index, returning new points."""
+        created = []
+        for data in records:
+            try:
+                point, new = self.points.upsert(data, self.ip)
+                if new:
+                    created.append(point)
+            except Exception as e:
+                logger.warning(f"Could not add point: {e}")
+        return created
+
+    async def add_point(self, data: dict):
+        await self.add_points([data])
+
+    async def add_points(self, records):
+        await self.enrich_points(self.merge_points(records))
+
+    async def enrich_points(self, points: list[Point]):
+        """
+        Link new points to their condenser, suction group and circuit tables,
+        fetching every rack and suction group not seen yet as one batch.
+        Parallelism is bounded by the interface's request slots.
+        """
+        racks: set = set()
+        groups: set[tuple] = set()
+        for point in points:
+            if x := point.meta.get("@rack_id"):
+                # Stored as a reference to the shared read_condenser table
+                point.meta["read_condenser_ref"] = x
+                if x not in self.read_condenser:
+                    racks.add(x)
+            if (y := point.meta.get("@suction_id")) and x:
+                point.meta["read_suction_group_ref"] = (x, y)
+                point.meta["read_circuit_ref"] = (x, y)
+                if (x, y) not in self.read_suction_group:
+                    groups.add((x, y))
+
+        if not racks and not groups:
+            return
+
+        logger.debug(
+            f"{self.name} fetching {len(racks)} condensers and {len(groups)} suction groups"
+        )
+        await asyncio.gather(
+            *(self.fetch_condenser(x) for x in racks),
+            *(self.fetch_suction_group(x, y) for x, y in groups),
+        )
+
+    async def fetch_condenser(self, rack_id):
+        self.read_condenser[rack_id] = await self.xml_interface.read_condenser(rack_id)
+
+    async def fetch_suction_group(self, rack_id, suction_id):
+        key = (rack_id, suction_id)
+        self.read_suction_group[key] = await self.xml_interface.read_suction_group(
+            rack_id, suction_id
+        )
+
+        if (nc := self.read_suction_group[key].get("num_circuits", None)) is None:
+            return
         try:
-            nodetype_id = data.get("@nodetype", "null")
-            if nodetype_id not in self.nodetypes:
-                self.nodetypes[nodetype_id] = Nodetype(nodetype_id, self)
-            await self.nodetypes[nodetype_id].add_node(data)
+            circuits = await asyncio.gather(
+                *(
+                    self.xml_interface.read_circuit(rack_id, suction_id, i + 1)
+                    for i in range(int(nc))
+                )
+            )
         except Exception as e:
-            logger.warning(f"Could not add nodetype: {e}")
+            logger.warning(f"Could not read circuits of {rack_id}_{suction_id}: {e}")
+            return
+        if circuits:
+            self.read_circuit[key] = list(circuits)
+            logger.debug(f"{len(circuits)} circuits of {rack_id}_{suction_id} read")
 
     async def discover_devices(self):
         logger.info(f"{self.name} is starting device discovery")
@@ -71,8 +170,7 @@ class DanfossBox:
         if isinstance(devices, dict):
             devices = [devices]
 
-        for dev in devices:
-            await self.add_nodetype(dev)
+        await self.add_points(devices)
         logger.info(f"{self.name} finished device discovery")
 
     async def discover_relays(self):
@@ -84,7 +182,7 @@ class DanfossBox:
 
         for rel in relays:
             rel["nodetype"] = "1"
-            await self.add_nodetype({f"@{k}": v for k, v in rel.items()})
+        await self.add_points([{f"@{k}": v for k, v in rel.items()} for rel in relays])
         logger.info(f"{self.name} finished relays discovery")
 
     async def discover_var_outs(self):
@@ -96,7 +194,9 @@ class DanfossBox:
 
         for var in var_outs:
             var["nodetype"] = "3"
-            await self.add_nodetype({f"@{k}": v for k, v in var.items()})
+        await self.add_points(
+            [{f"@{k}": v for k, v in var.items()} for var in var_outs]
+        )
         logger.info(f"{self.name} Finished var_outs discovery")
 
     async def discover_additional_metadata(self):
@@ -110,8 +210,8 @@ class DanfossBox:
         hvacs = hvacs.get("hvacs", {})
         if hvacs != {}:
             hvacs = x if isinstance((x := hvacs.get("hvac")), list) else [x]
+            await self.add_points(hvacs)
             for hvac in hvacs:
-                await self.add_nodetype(hvac)
                 self.hvacs[hvac.get("@ahindex")] = self.get_point(
                     hvac.get("@nodetype"),
                     hvac.get("@node"),
@@ -132,8 +232,8 @@ class DanfossBox:
 
         lightings = lightings.get("device", "null")
         lightings = x if isinstance((x := lightings), list) else [x]
+        await self.add_points(lightings)
         for lighting in lightings:
-            await self.add_nodetype(lighting)
             self.lighting[lighting.get("index")] = self.get_point(
                 lighting.get("@nodetype"),
                 lighting.get("@node"),
@@ -145,163 +245,172 @@ class DanfossBox:
     async def update_monitors(self):
         logger.info(f"{self.name} Updating nodetype monitor points")
 
-        cmds = []
-        points = self.yield_points()
-        for each in points:
-            cmds.append(
-                {
-                    "nodetype": each.parent_nodetype.nodetype_id,
-                    "node": each.parent_node.node_id,
-                    "mod": each.parent_mod.mod_id,
-                    "point": each.point_id,
-                }
-            )
-        resp = await self.xml_interface.read_monitor_detail(cmds)
-
-        resp_s = resp.get("monitor")
+        version = self.points.version
+        cmds = self.cached_addresses(
+            "monitor",
+            version,
+            lambda: [
+                {"nodetype": nodetype, "node": node, "mod": mod, "point": point}
+                for nodetype, node, mod, point in (each.key for each in self.points)
+            ],
+        )
+        resp = await self.xml_interface.read_monitor_detail(
+            cmds, body_key=("monitor", version)
+        )
 
-        if resp_s is None:
-            return
-        elif not isinstance(resp_s, list):
-            resp_s = [resp_s]
-
-        for s in resp_s:
-            sx = {
-                k: v
-                for k, v in s.items()
-                if k in ["@nodetype", "@node", "@mod", "@point"]
-            }
-            sx["monitor"] = {
-                k: v
-                for k, v in s.items()
-                if k not in ["@nodetype", "@node", "@mod", "@point"]
-            }
-            await self.add_nodetype(sx)
+        await self.add_points(resp.get("monitor", []))
         logger.info(f"{self.name} Finished updating monitoring points")
 
-    async def update_nodetype_0(self):
-        logger.info(f"{self.name} Updating nodetype 0")
-        nodetype = self.nodetypes.get("0")
+    async def update_point_nodetype(self, nodetype_id: str, action: str, tag: str):
+        logger.info(f"{self.name} Updating nodetype {nodetype_id}")
+        nodetype = self.points.nodetype(nodetype_id)
         if not nodetype:
             return
 
-        cmds = []
-        try:
-            for n_id, n in nodetype.nodes.items():
-                for m_id, m in n.mods.items():
-                    for p_id, p in m.points.items():
-                        cmds.append(
-                            {"node": int(n_id), "mod": int(m_id), "point": int(p_id)}
-                        )
-        except:
+        version = self.points.nodetype_version(nodetype_id)
+        cmds = self.cached_addresses(
+            nodetype_id,
+            version,
+            lambda: [
+                {"node": int(node), "mod": int(mod), "point": int(point)}
+                for _, node, mod, point in nodetype
+            ],
+        )
+        if cmds is None:
             return
 
-        resp = await self.xml_interface.read_input(cmds)
+        read = getattr(self.xml_interface, action)
+
+        async def fetch(chunk):
+            # Chunks are slices of a list fixed for this version, so the first
+            # address and length identify the body
+            first = chunk[0]
+            body_key = (
+                nodetype_id,
+                version,
+                (first["node"], first["mod"], first["point"]),
+                len(chunk),
+            )
+            resp = await read(chunk, body_key=body_key)
+            # Neither a dead panel nor an open breaker says anything about the
+            # chunk size, so the run ends without shrinking the chunks
+            if resp.get("@error") in ("Connection Error", "Circuit open"):
+                raise ChunkAborted()
+            return None if "@error" in resp else resp.get(tag, [])
+
+        if nodetype_id not in self.chunkers:
+            self.chunkers[nodetype_id] = AdaptiveChunker(
+                f"{self.name} {action}",
+                initial_size=self.chunk_size,
+                min_size=min(10, self.chunk_size),
+                target_seconds=self.xml_interface.timeout / 2,
+            )
+        chunks = await self.chunkers[nodetype_id].run(
+            cmds, fetch, self.xml_interface.max_concurrent_requests
+        )
 
-        resp_s = resp.get("input")
+        attributes = self.read_attributes.setdefault(nodetype_id, set())
+        for records in chunks:
+            attributes.update(k for r in records if isinstance(r, dict) for k in r)
+            await self.add_points(records)
+        logger.info(f"{self.name} Finished updating nodetype {nodetype_id}")
+
+    def cached_addresses(self, scope: str, version: int, build) -> list | None:
+        """
+        Address list of a bulk read, rebuilt only when the point index version
+        changes. None when the points cannot be addressed.
+        """
+        cached = self.address_lists.get(scope)
+        if cached is None or cached[0] != version:
+            try:
+                cmds = build()
+            except Exception:
+                cmds = None
+            cached = self.address_lists[scope] = (version, cmds)
+        return cached[1]
+
+    async def update_point_nodetypes(self):
+        """
+        Update nodetypes 0-3, from a read_points_si snapshot when enabled and
+        supported. Nodetypes the snapshot does not fully cover, or that have
+        not been read on their own yet, fall back to their own chunked reads.
+        """
+        pending = list(POINT_NODETYPES)
+        if self.bulk_snapshot and self.snapshot_supported is not False:
+            covered = await self.update_snapshot()
+            pending = [args for args in pending if args[0] not in covered]
+
+        for args in pending:
+            await self.update_point_nodetype(*args)
+
+    async def update_snapshot(self) -> set[str]:
+        """Merge a read_points_si snapshot, returning the nodetypes it covered."""
+        logger.info(f"{self.name} Reading point snapshot")
+        resp = await self.xml_interface.read_points_si()
+        if (error := resp.get("@error")) is not None:
+            if error not in TRANSPORT_ERRORS:
+                logger.info(f"{self.name} does not support read_points_si: {error}")
+                self.snapshot_supported = False
+            return set()
+
+        records: list[dict] = []
+        for value in resp.values():
+            for record in value if isinstance(value, list) else [value]:
+                if isinstance(record, dict) and all(k in record for k in ADDRESS_KEYS):
+                    records.append(record)
+
+        if not records:
+            if self.snapshot_supported is None:
+                logger.info(f"{self.name} read_points_si returned no points")
+                self.snapshot_supported = False
+            return set()
+        self.snapshot_supported = True
+
+        # read_points_si answers in SI units whatever the request asks for,
+        # while the point reads use units="U". Only known points with units on
+        # both sides, and the same units, are taken. A nodetype counts as
+        # covered only when the snapshot carries every attribute its own
+        # reads return, so none of them stops refreshing.
+        usable: dict[str, dict[tuple, dict]] = {}
+        for record in records:
+            key = tuple(record[k] for k in ADDRESS_KEYS)
+            point = self.points.get(key)
+            attributes = self.read_attributes.get(key[0])
+            if (
+                point is None
+                or not attributes
+                or record.get("@units") is None
+                or record.get("@units") != point.meta.get("@units")
+                or not attributes <= record.keys()
+            ):
+                continue
+            usable.setdefault(key[0], {})[key] = {k: record[k] for k in attributes}
+        covered = {
+            nodetype_id
+            for nodetype_id, *_ in POINT_NODETYPES
+            if nodetype_id in usable
+            and self.points.nodetype(nodetype_id).keys() <= usable[nodetype_id].keys()
+        }
 
-        if resp_s is None:
-            return
-        elif not isinstance(resp_s, list):
-            resp_s = [resp_s]
+        await self.add_points(
+            [r for nodetype_id in covered for r in usable[nodetype_id].values()]
+        )
+        logger.info(
+            f"{self.name} Snapshot covered nodetypes {sorted(covered) or 'none'}"
+        )
+        return covered
 
-        for s in resp_s:
-            s["@nodetype"] = "0"
-            await self.add_nodetype(s)
-        logger.info(f"{self.name} Finished updating nodetype 0")
+    async def update_nodetype_0(self):
+        await self.update_point_nodetype(*POINT_NODETYPES[0])
 
     async def update_nodetype_1(self):
-        logger.info(f"{self.name} Updating nodetype 1")
-        nodetype = self.nodetypes.get("1")
-        if not nodetype:
-            return
-
-        cmds = []
-        try:
-            for n_id, n in nodetype.nodes.items():
-                for m_id, m in n.mods.items():
-                    for p_id, p in m.points.items():
-                        cmds.append(
-                            {"node": int(n_id), "mod": int(m_id), "point": int(p_id)}
-                        )
-        except:
-            return
-
-        resp = await self.xml_interface.read_relay(cmds)
-
-        resp_s = resp.get("relay")
-
-        if resp_s is None:
-            return
-        elif not isinstance(resp_s, list):
-            resp_s = [resp_s]
-
-        for s in resp_s:
-            s["@nodetype"] = "1"
-            await self.add_nodetype(s)
-        logger.info(f"{self.name} Finished updating nodetype 1")
+        await self.update_point_nodetype(*POINT_NODETYPES[1])
 
     async def update_nodetype_2(self):
-        logger.info(f"{self.name} Updating nodetype 2")
-        nodetype2 = self.nodetypes.get("2")
-        if not nodetype2:
-            return
-
-        cmds = []
-        try:
-            for n_id, n in nodetype2.nodes.items():
-                for m_id, m in n.mods.items():
-                    for p_id, p in m.points.items():
-                        cmds.append(
-                            {"node": int(n_id), "mod": int(m_id), "point": int(p_id)}
-                        )
-        except:
-            return
-
-        resp = await self.xml_interface.read_sensor(cmds)
-
-        resp_s = resp.get("sensor")
-
-        if resp_s is None:
-            return
-        elif not isinstance(resp_s, list):
-            resp_s = [resp_s]
-
-        for s in resp_s:
-            s["@nodetype"] = "2"
-            await self.add_nodetype(s)
-        logger.info(f"{self.name} Finished updating nodetype 2")
+        await self.update_point_nodetype(*POINT_NODETYPES[2])
 
     async def update_nodetype_3(self):
-        logger.info(f"{self.name} Updating nodetype 3")
-        nodetype3 = self.nodetypes.get("3")
-        if not nodetype3:
-            return
-
-        cmds = []
-        try:
-            for n_id, n in nodetype3.nodes.items():
-                for m_id, m in n.mods.items():
-                    for p_id, p in m.points.items():
-                        cmds.append(
-                            {"node": int(n_id), "mod": int(m_id), "point": int(p_id)}
-                        )
-        except:
-            return
-
-        resp = await self.xml_interface.read_var_out(cmds)
-
-        resp_s = resp.get("var_output")
-
-        if resp_s is None:
-            return
-        elif not isinstance(resp_s, list):
-            resp_s = [resp_s]
-
-        for s in resp_s:
-            s["@nodetype"] = "3"
-            await self.add_nodetype(s)
-        logger.info(f"{self.name} Finished updating nodetype 3")
+        await self.update_point_nodetype(*POINT_NODETYPES[3])
 
     async def update_nodetype_6(self):
         logger.info(f"{self.name} Updating nodetype 6")
@@ -320,7 +429,7 @@ class DanfossBox:
             m["@mod"] = m.get("@mod", "-1")
             m["@point"] = m.get("@point", "-1")
 
-            await self.add_nodetype(m)
+            await self.add_point(m)
         logger.info(f"{self.name} Finished updating nodetype 6")
 
     async def update_lighting_zone(self):
@@ -342,60 +451,36 @@ class DanfossBox:
         logger.info(f"{self.name} Updating alarms")
         alarm_references = await self.xml_interface.alarm_summary()
 
-        acked_refs = alarm_references.get("acked", {}).get("ref", None)
-        if acked_refs is not None:
-            if not isinstance(acked_refs, list):
-                acked_refs = [acked_refs]
-            for ref in acked_refs:
-                details = await self.xml_interface.alarm_detail(ref)
-                for each in ["nodetype", "node", "mod", "point"]:
-                    if each in details.keys():
-                        details[f"@{each}"] = details.get(each)
-                    final = {
-                        k: v
-                        for k, v in details.items()
-                        if k in ["@nodetype", "@node", "@mod", "@point"]
-                    }
-                    final["alarm_detail_data"] = {
-                        k: v
-                        for k, v in details.items()
-                        if k not in ["@nodetype", "@node", "@mod", "@point"]
-                    }
-                    final["@nodetype"] = f"alarm_{ref}"
-                    final["@node"] = f"alarm_{ref}"
-                    final["@mod"] = f"alarm_{ref}"
-                    final["@point"] = f"alarm_{ref}"
-                await self.add_nodetype(final)
-
-        active_refs = alarm_references.get("active", {}).get("ref", None)
-        if active_refs is not None:
-            if not isinstance(active_refs, list):
-                active_refs = [active_refs]
-            for ref in active_refs:
+        listed = set()
+        for state in ["acked", "active"]:
+            refs = (alarm_references.get(state) or {}).get("ref", None)
+            if refs is None:
+                continue
+            if not isinstance(refs, list):
+                refs = [refs]
+            for ref in refs:
+                listed.add(ref)
+                # Only fetch details for refs that are new or changed state
+                if self.alarm_detail_cache.get(ref) == state:
+                    continue
+
                 details = await self.xml_interface.alarm_detail(ref)
-                for each in ["nodetype", "node", "mod", "point"]:
-                    if each in details.keys():
-                        details[f"@{each}"] = details.get(each)
-                    final = {
-                        k: v
-                        for k, v in details.items()
-                        if k in ["@nodetype", "@node", "@mod", "@point"]
-                    }
-                    final["alarm_detail_data"] = {
-                        k: v
-                        for k, v in details.items()
-                        if k not in ["@nodetype", "@node", "@mod", "@point"]
-                    }
-                    final["@nodetype"] = f"alarm_{ref}"
-                    final["@node"] = f"alarm_{ref}"
-                    final["@mod"] = f"alarm_{ref}"
-                    final["@point"] = f"alarm_{ref}"
-                await self.add_nodetype(final)
-
-        cleared_refs = alarm_references.get("cleared", {}).get("ref", None)
+                await self.add_point(self.build_alarm_record(ref, details))
+                if "@error" not in details:
+                    self.alarm_detail_cache[ref] = state
+
+        # Refs can leave the summary without showing up as cleared, e.g. when
+        # the alarm log is purged
+        if "@error" not in alarm_references:
+            for ref in self.alarm_detail_cache.keys() - listed:
+                del self.alarm_detail_cache[ref]
+
+        cleared_refs = (alarm_references.get("cleared") or {}).get("ref", None)
         cleared_refs = (
             cleared_refs if isinstance(cleared_refs, list) else [cleared_refs]
         )
+        for ref in cleared_refs:
+            self.alarm_detail_cache.pop(ref, None)
         try:
             points = self.yield_points()
             for each in points:
@@ -411,8 +496,81 @@ class DanfossBox:
             logger.warning(f"Unexpected error when clearing old alarm data: {e}")
         logger.info(f"{self.name} Finished updating alarms")
 
+    def build_alarm_record(self, ref, details: dict) -> dict:
+        for each in ["nodetype", "node", "mod", "point"]:
+            if each in details.keys():
+                details[f"@{each}"] = details.get(each)
+        final = {
+            k: v
+            for k, v in details.items()
+            if k in ["@nodetype", "@node", "@mod", "@point"]
+        }
+        final["alarm_detail_data"] = {
+            k: v
+            for k, v in details.items()
+            if k not in ["@nodetype", "@node", "@mod", "@point"]
+        }
+        final["@nodetype"] = f"alarm_{ref}"
+        final["@node"] = f"alarm_{ref}"
+        final["@mod"] = f"alarm_{ref}"
+        final["@point"] = f"alarm_{ref}"
+        return final
+
     async def update_cs_devices(self):
+        devs = None
+        if (
+            self.cs_topology is not None
+            and time.monotonic() - self.cs_last_scan < self.cs_rescan_seconds
+        ):
+            devs = await self.poll_cs_devices()
+        if devs is None:
+            devs = await self.scan_cs_devices()
+        self.cs_devices = devs
+
+        final = {
+            "@nodetype": "255",
+            "@node": "-1",
+            "@mod": "-1",
+            "@point": "-1",
+            "leak_devices": devs,
+        }
+        await self.add_point(final)
+
+    async def poll_cs_devices(self) -> list[dict] | None:
+        """
+        Re-read the known leak detector zones directly. Returns None when a
+        zone answers with another name, so the caller can do a full scan.
+        Offline zones are reported as such, and when a read fails the last
+        published devices are kept.
+        """
+        resps = await asyncio.gather(
+            *(
+                self.xml_interface.read_cs_device_value(device_num, device_zone)
+                for device_num, device_zone in self.cs_topology
+            )
+        )
+        if any("@error" in resp for resp in resps):
+            logger.warning(f"{self.name} could not poll leak devices")
+            return self.cs_devices
+
+        devs = []
+        for (address, known_name), resp in zip(self.cs_topology.items(), resps):
+            resp_x = resp.get("devicevalue", {})
+            name = resp_x.get("@name", "")
+            status = resp_x.get("@status", "Offline")
+            if "Offline" in status:
+                name = known_name
+            elif name != known_name:
+                logger.info(
+                    f"{self.name} leak device topology changed at {address}, rescanning"
+                )
+                return None
+            devs.append({"name": name, "status": status})
+        return devs
+
+    async def scan_cs_devices(self) -> list[dict]:
         devs = []
+        topology = {}
         device_num = 1
         device_zone = 1
         conseq_flag = 0
@@ -421,6 +579,10 @@ class DanfossBox:
             resp = await self.xml_interface.read_cs_device_value(
                 device_num, device_zone
             )
+            if "@error" in resp:
+                # Incomplete scan, try again next cycle
+                self.cs_topology = None
+                return devs
 
             resp_x = resp.get("devicevalue", {})
             name = resp_x.get("@name", "")
@@ -438,60 +600,38 @@ class DanfossBox:
                 conseq_flag += 1
             else:
                 devs.append({"name": name, "status": status})
+                topology[(device_num, device_zone)] = name
                 device_zone += 1
                 conseq_flag = 0
 
-        final = {
-            "@nodetype": "255",
-            "@node": "-1",
-            "@mod": "-1",
-            "@point": "-1",
-            "leak_devices": devs,
-        }
-        await self.add_nodetype(final)
+        self.cs_topology = topology
+        self.cs_last_scan = time.monotonic()
+        logger.info(f"{self.name} found {len(topology)} leak device zones")
+        return devs
 
     async def update_hvacs(self):
         for unit in self.hvacs:
             hu = await self.xml_interface.read_hvac_unit(int(unit))
-            await self.add_nodetype(hu)
+            await self.add_point(hu)
 
             hs = await self.xml_interface.read_hvac_service(int(unit))
             hs["@nodetype"] = hu.get("@nodetype")
             hs["@node"] = hu.get("@node")
             hs["@mod"] = hu.get("@mod")
             hs["@point"] = hu.get("@point")
-            await self.add_nodetype(hs)
+            await self.add_point(hs)
 
     async def update_circuit_suction(self):
         logger.info(f"{self.name} Updating suction groups and circuits")
         self.read_circuit = {}
-        for key in self.read_suction_group.keys():
-            self.read_suction_group[key] = await self.xml_interface.read_suction_group(
-                key[0], key[1]
-            )
-
-            if (
-                nc := self.read_suction_group[key].get("num_circuits", None)
-            ) is not None:
-                try:
-                    for i in range(int(nc)):
-                        circ = await self.xml_interface.read_circuit(
-                            key[0], key[1], i + 1
-                        )
-                        if key not in self.read_circuit.keys():
-                            self.read_circuit[key] = []
-                        self.read_circuit[key].append(circ)
-                        logger.debug(f"Circuit {key[0]}_{key[1]}_{i+1} updated")
-                except:
-                    pass
+        await asyncio.gather(
+            *(self.fetch_suction_group(x, y) for x, y in list(self.read_suction_group))
+        )
 
     @logtimer
     async def update_all(self):
         logger.info(f"{self.name} Starting update loop")
-        await self.update_nodetype_0()
-        await self.update_nodetype_1()
-        await self.update_nodetype_2()
-        await self.update_nodetype_3()
+        await self.update_point_nodetypes()
         await self.update_nodetype_6()
         await self.update_lighting_zone()
         await self.update_alarms()
@@ -499,63 +639,43 @@ class DanfossBox:
         await self.update_cs_devices()
         await self.update_hvacs()
         await self.update_circuit_suction()
+        if (breaker := self.xml_interface.breaker).state != breaker.CLOSED:
+            logger.warning(f"{self.name} finished update loop with {breaker}")
         logger.info(f"{self.name} Finished update loop")
 
     def print_hierarchy(self):
         root = Tree(f"[bold]{self.xml_interface.ip}[/bold]")
 
-        for nt_id, nt in self.nodetypes.items():
-            nt_branch = root.add(
-                f"[cyan]Nodetype {nt_id}[/cyan] ({nt.verbose_nodetype_id})"
-            )
-            for node_id, node in nt.nodes.items():
-                node_branch = nt_branch.add(f"Node {node_id}")
-                for mod_id, mod in node.mods.items():
-                    mod_branch = node_branch.add(f"Mod {mod_id}")
-                    for point_id, point in mod.points.items():
-                        if nt_id == "6":
-                            val = point.meta.get("kw", "?")
-                        else:
-                            val = point.meta.get("#text", "?")
-                        mod_branch.add(f"Point {point_id} : {val}")
+        branches: dict[tuple, Tree] = {}
+        for point in self.points:
+            nt_id, node_id, mod_id, point_id = point.key
+            if (nt_key := (nt_id,)) not in branches:
+                branches[nt_key] = root.add(
+                    f"[cyan]Nodetype {nt_id}[/cyan] ({VERBOSE_NODETYPES.get(nt_id, 'Unknown')})"
+                )
+            if (node_key := (nt_id, node_id)) not in branches:
+                branches[node_key] = branches[nt_key].add(f"Node {node_id}")
+            if (mod_key := (nt_id, node_id, mod_id)) not in branches:
+                branches[mod_key] = branches[node_key].add(f"Mod {mod_id}")
+
+            if nt_id == "6":
+                val = point.meta.get("kw", "?")
+            else:
+                val = point.meta.get("#text", "?")
+            branches[mod_key].add(f"Point {point_id} : {val}")
 
         rprint(root)
 
     def get_point(self, nodetype_id, node_id, mod_id, point_id):
-        nodetype_id = str(nodetype_id)
-        node_id = str(node_id)
-        mod_id = str(mod_id)
-        point_id = str(point_id)
-
-        nodetype = self.nodetypes.get(nodetype_id)
-        if nodetype is None:
-            return None
-
-        node = nodetype.nodes.get(node_id)
-        if node is None:
-            return None
-
-        mod = node.mods.get(mod_id)
-        if mod is None:
-            return None
-
-        point = mod.points.get(point_id)
-        if point is None:
-            return None
-
-        return point
+        return self.points.get(
+            (str(nodetype_id), str(node_id), str(mod_id), str(point_id))
+        )
 
     def yield_points(self):
-        for nt_id, nt in self.nodetypes.items():
-            for n_id, n in nt.nodes.items():
-                for m_id, m in n.mods.items():
-                    for p_id, p in m.points.items():
-                        yield p
+        return iter(self.points)
 
     def get_data(self):
-        data = []
-        for point in self.yield_points():
-            data.append(point.meta)
+        data = [point.meta for point in self.points]
         shared_data = {
             "@nodetype": "0",
             "@node": "0",
@@ -568,6 +688,7 @@ class DanfossBox:
             "read_units": self.read_units,
             "schedule_summary": self.schedule_summary,
             "read_store_schedule": self.read_store_schedule,
+            "breaker": self.xml_interface.breaker.snapshot(),
         }
         data.append(shared_data)
         return data
@@ -576,135 +697,126 @@ class DanfossBox:
         return f"DanfossBox(ip={self.ip}, name={self.name})"
 
 
-class Point(aobject):
-    async def __init__(self, data, parent):
-        self.point_id = data.get("@point", "null")
-        self.alarms = {}
-        self.meta = data
-        self.parent_mod = parent
-        self.parent_node = self.parent_mod.parent_node
-        self.parent_nodetype = self.parent_node.parent_nodetype
-        self.parent_dbox = self.parent_nodetype.parent_dbox
-        logger.debug(
-            f"New point at {self.parent_dbox.xml_interface.ip}: {self.point_id}"
-        )
-        self.meta["ip"] = self.parent_dbox.xml_interface.ip
+PointKey = tuple[str, str, str, str]
+
+# Nodetypes read in bulk: (nodetype, action, record tag)
+POINT_NODETYPES = (
+    ("0", "read_input", "input"),
+    ("1", "read_relay", "relay"),
+    ("2", "read_sensor", "sensor"),
+    ("3", "read_var_out", "var_output"),
+)
+
+# "@error" values produced by the interface itself rather than the panel
+TRANSPORT_ERRORS = ("Connection Error", "Circuit open", "Software parsing error")
+
+VERBOSE_NODETYPES = {
+    "0": "On/Off Input",
+    "1": "Relay Output",
+    "2": "Sensor Input",
+    "3": "Variable Output",
+    "6": "Meter",
+    "16": "Generic Device",
+    "255": "Empty Node",
+}
+
+
+class Point:
+    __slots__ = ("key", "meta")
+
+    def __init__(self, key: PointKey, meta: dict):
+        self.key = key
+        self.meta = meta
+
+    @property
+    def nodetype_id(self) -> str:
+        return self.key[0]
 
-        await self.get_condenser_data()
-        await self.get_suction_group_data()
+    @property
+    def node_id(self) -> str:
+        return self.key[1]
+
+    @property
+    def mod_id(self) -> str:
+        return self.key[2]
+
+    @property
+    def point_id(self) -> str:
+        return self.key[3]
 
     def __repr__(self):
         return f"<Point {self.point_id}>"
 
-    async def get_condenser_data(self):
-        if x := self.meta.get("@rack_id"):
-            logger.debug("Checking condenser mappings")
-            if x not in self.parent_dbox.read_condenser.keys():
-                self.parent_dbox.read_condenser[x] = (
-                    await self.parent_dbox.xml_interface.read_condenser(x)
-                )
-            # self.meta["read_condenser"] = self.parent_dbox.read_condenser[x]
-            # Change to reference
-            self.meta["read_condenser_ref"] = x
-
-    async def get_suction_group_data(self):
-        if (y := self.meta.get("@suction_id")) and (x := self.meta.get("@rack_id")):
-            logger.debug("Checking suction group mappings")
-            if (x, y) not in self.parent_dbox.read_suction_group.keys():
-                self.parent_dbox.read_suction_group[(x, y)] = (
-                    await self.parent_dbox.xml_interface.read_suction_group(x, y)
-                )
 
-                # read circuits
-                if (
-                    nc := self.parent_dbox.read_suction_group[(x, y)].get(
-                        "num_circuits", None
-                    )
-                ) is not None:
-                    logger.info("Discovering circuits")
-                    try:
-                        for i in range(int(nc)):
-                            circ = await self.parent_dbox.xml_interface.read_circuit(
-                                x, y, i + 1
-                            )
-                            if (x, y) not in self.parent_dbox.read_circuit.keys():
-                                self.parent_dbox.read_circuit[(x, y)] = []
-                            self.parent_dbox.read_circuit[(x, y)].append(circ)
-                            logger.debug(f"Circuit {x}_{y}_{i+1} added")
-                    except:
-                        pass
-            self.meta["read_suction_group_ref"] = (x, y)
-            self.meta["read_circuit_ref"] = (x, y)
-
-
-class Mod:
-    def __init__(self, mod_id: str, parent):
-        self.mod_id = mod_id
-        self.points: dict[str, Point] = {}
-        self.parent_node = parent
-        self.parent_nodetype = self.parent_node.parent_nodetype
-        self.parent_dbox = self.parent_nodetype.parent_dbox
-        logger.debug(f"New mod at {self.parent_dbox.xml_interface.ip}: {mod_id}")
-
-    async def add_point(self, data):
-        point_id = data.get("@point", "null")
-        if point_id not in self.points:
-            self.points[point_id] = await Point(
-                {k: v for k, v in data.items() if k not in ["alarm_detail_data"]}, self
-            )
-            ref = data.get("alarm_detail_data", {}).get("@current", None)
-            if ref is not None:
-                self.points[point_id].meta["alarm_detail"] = {}
-                self.points[point_id].meta["alarm_detail"][ref] = data.get(
-                    "alarm_detail_data"
-                )
-        else:
-            for k, v in data.items():
-                if k != "alarm_detail_data":
-                    self.points[point_id].meta[k] = v
-                else:
-                    ref = v.get("@current", "-1")
-                    if "alarm_detail" not in self.points[point_id].meta.keys():
-                        self.points[point_id].meta["alarm_detail"] = {}
-                    self.points[point_id].meta["alarm_detail"][ref] = v
-
-
-class Node(aobject):
-    async def __init__(self, node_id: str, parent):
-        self.node_id = node_id
-        self.mods: dict[str, Mod] = {}
-        self.parent_nodetype = parent
-        self.parent_dbox = self.parent_nodetype.parent_dbox
-        logger.debug(f"New node at {self.parent_dbox.xml_interface.ip}: {node_id}")
-
-    async def add_mod(self, data):
-        mod_id = data.get("@mod", "null")
-        if mod_id not in self.mods:
-            self.mods[mod_id] = Mod(mod_id, self)
-        await self.mods[mod_id].add_point(data)
-
-
-class Nodetype:
-    def __init__(self, nodetype_id: str, parent: DanfossBox):
-        self.nodetype_id = nodetype_id
-        verbose_nodetypes = {
-            "0": "On/Off Input",
-            "1": "Relay Output",
-            "2": "Sensor Input",
-            "3": "Variable Output",
-            "6": "Meter",
-            "16": "Generic Device",
-            "255": "Empty Node",
-        }
-        self.verbose_nodetype_id = verbose_nodetypes.get(self.nodetype_id, "Unknown")
-        self.nodes: dict[str, Node] = {}
-        self.parent_dbox = parent
-        logger.debug(
-            f"New nodetype at {self.parent_dbox.xml_interface.ip}: {nodetype_id}"
+class PointIndex:
+    """
+    Flat store of a panel's points keyed by (nodetype, node, mod, point).
+    Iteration is grouped by nodetype and cached until a point is added.
+    Versions count added points, overall and per nodetype, so address lists
+    and request bodies built from the index can be reused until they change.
+    """
+
+    __slots__ = ("points", "nodetypes", "version", "nodetype_versions", "_order")
+
+    def __init__(self):
+        self.points: dict[PointKey, Point] = {}
+        self.nodetypes: dict[str, dict[PointKey, Point]] = {}
+        self.version: int = 0
+        self.nodetype_versions: dict[str, int] = {}
+        self._order: list[Point] | None = None
+
+    def __len__(self):
+        return len(self.points)
+
+    def __iter__(self):
+        if self._order is None:
+            self._order = [
+                point for points in self.nodetypes.values() for point in points.values()
+            ]
+        return iter(self._order)
+
+    def get(self, key: PointKey) -> Point | None:
+        return self.points.get(key)
+
+    def nodetype(self, nodetype_id: str) -> dict[PointKey, Point]:
+        return self.nodetypes.get(nodetype_id, {})
+
+    def nodetype_version(self, nodetype_id: str) -> int:
+        return self.nodetype_versions.get(nodetype_id, 0)
+
+    def upsert(self, data: dict, ip: str) -> tuple[Point, bool]:
+        """Merge a response record into its point. Returns (point, created)."""
+        key = (
+            data.get("@nodetype", "null"),
+            data.get("@node", "null"),
+            data.get("@mod", "null"),
+            data.get("@point", "null"),
         )
 
-    async def add_node(self, data: dict):
-        node_id = data.get("@node", "null")
-        if node_id not in self.nodes:
-            self.nodes[node_id] = await Node(node_id, self)
-        await self.nodes[node_id].add_mod(data)
+        point = self.points.get(key)
+        if point is None:
+            meta = {k: v for k, v in data.items() if k != "alarm_detail_data"}
+            meta["ip"] = ip
+            ref = data.get("alarm_detail_data", {}).get("@current", None)
+            if ref is not None:
+                meta["alarm_detail"] = {ref: data.get("alarm_detail_data")}
+
+            point = Point(key, meta)
+            self.points[key] = point
+            self.nodetypes.setdefault(key[0], {})[key] = point
+            self.version += 1
+            self.nodetype_versions[key[0]] = self.nodetype_version(key[0]) + 1
+            self._order = None
+            logger.debug(f"New point at {ip}: {key}")
+            return point, True
+
+        meta = point.meta
+        for k, v in data.items():
+            if k != "alarm_detail_data":
+                meta[k] = v
+            else:
+                ref = v.get("@current", "-1")
+                if "alarm_detail" not in meta:
+                    meta["alarm_detail"] = {}
+                meta["alarm_detail"][ref] = v
+        return point, False
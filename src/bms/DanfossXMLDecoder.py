@@ -0,0 +1,99 @@
+import xml.etree.ElementTree as ET
+
+# Bulk point reads: action -> (record tag, nodetype injected into each record)
+POINT_RESPONSES: dict[str, tuple[str, str | None]] = {
+    "read_input": ("input", "0"),
+    "read_relay": ("relay", "1"),
+    "read_sensor": ("sensor", "2"),
+    "read_var_out": ("var_output", "3"),
+    "read_monitor_detail": ("monitor", None),
+}
+
+ADDRESS_KEYS = ("@nodetype", "@node", "@mod", "@point")
+
+
+def add_child(mapping: dict, key: str, value) -> None:
+    if key not in mapping:
+        mapping[key] = value
+    elif isinstance(mapping[key], list):
+        mapping[key].append(value)
+    else:
+        mapping[key] = [mapping[key], value]
+
+
+def element_to_value(element: ET.Element):
+    """
+    Convert an element the same way xmltodict would: attributes become "@key",
+    child elements become keys (lists when repeated) and text becomes "#text",
+    or the bare string when the element has nothing else.
+    """
+    value: dict = {f"@{k}": v for k, v in element.attrib.items()}
+
+    text = element.text or ""
+    for child in element:
+        add_child(value, child.tag, element_to_value(child))
+        text += child.tail or ""
+
+    text = text.strip()
+    if not value:
+        return text or None
+    if text:
+        value["#text"] = text
+    return value
+
+
+def iter_events(response_text: str, chunk_size: int = 65536):
+    parser = ET.XMLPullParser(events=("start", "end"))
+    for i in range(0, len(response_text), chunk_size):
+        parser.feed(response_text[i : i + chunk_size])
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def decode_point_response(action: str, response_text: str) -> dict:
+    """
+    Decode a bulk point read straight into the records DanfossBox merges.
+
+    The record list is always a list (possibly empty). Records of the
+    read_input/read_relay/read_sensor/read_var_out responses carry their
+    "@nodetype", and read_monitor_detail records are already split into the
+    point address and a "monitor" mapping with the remaining fields.
+    """
+    tag, nodetype = POINT_RESPONSES[action]
+    root = None
+    depth = 0
+    resp: dict = {}
+    records: list[dict] = []
+    for event, element in iter_events(response_text):
+        if event == "start":
+            if root is None:
+                root = element
+                resp.update({f"@{k}": v for k, v in element.attrib.items()})
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth != 1:
+            continue
+
+        # A direct child of <resp> is complete: convert it and drop it from
+        # the tree so only one response row is held as elements at a time.
+        if element.tag != tag:
+            add_child(resp, element.tag, element_to_value(element))
+        else:
+            record = element_to_value(element)
+            if not isinstance(record, dict):
+                record = {} if record is None else {"#text": record}
+
+            if nodetype is not None:
+                record["@nodetype"] = nodetype
+            else:
+                address = {k: record.pop(k) for k in ADDRESS_KEYS if k in record}
+                address["monitor"] = record
+                record = address
+            records.append(record)
+        root.remove(element)
+
+    resp[tag] = records
+    return resp
@@ -1,7 +1,9 @@
 import xml.etree.ElementTree as ET
 import xmltodict as xtd
+from .DanfossXMLDecoder import POINT_RESPONSES, decode_point_response
 import core
 import json
+from collections import OrderedDict
 from typing import Any
 from tenacity import (
     retry,
@@ -14,19 +16,44 @@ from aiohttp_socks import ProxyConnector
 import platform
 import logging
 import os
+import time
 
 logger = logging.getLogger(__name__)
 
 with open(core.GENERAL_SETTINGS, "r") as f:
     general_settings = json.load(f)
 
+# Discovery reads are shared between concurrent callers and reused for this long
+SINGLE_FLIGHT_TTL = general_settings.get("single_flight_ttl_seconds", 30)
+
 
 def process_command(func):
     async def wrapper(self, *args, **kwargs):
         sleep = general_settings.get("http_request_delay", 3)
-        element: ET.Element = func(self, *args, **kwargs)
-        action: str = element.attrib.get("action", "unknown")
-        element_string: str = ET.tostring(element, encoding="unicode")
+        body_key: tuple | None = kwargs.pop("body_key", None)
+        cached = self.cached_body(func.__name__, body_key)
+        if cached is None:
+            element: ET.Element = func(self, *args, **kwargs)
+            action: str = element.attrib.get("action", "unknown")
+            element_string: str = ET.tostring(element, encoding="unicode")
+            self.store_body(func.__name__, body_key, action, element_string)
+        else:
+            action, element_string = cached
+
+        if not self.breaker.allow():
+            # Not counted in failed_requests, or a short outage would trip the
+            # hard stop in a couple of fast cycles. connection_failed covers
+            # long outages by how long the breaker has been open.
+            logger.debug(f"Breaker open, not sending {action} to {self.endpoint}")
+            if (
+                general_settings.get("use_err_files", False)
+                and self.connection_failed()
+            ):
+                self.write_err_file()
+            return {
+                "@action": action,
+                "@error": "Circuit open",
+            }
 
         logger.debug(f"Sending action {action} to {self.endpoint}")
 
@@ -44,6 +71,7 @@ def process_command(func):
         async def send_request(connector, timeout):
 
             async with aiohttp.ClientSession(connector=connector) as session:
+                start = time.perf_counter()
                 async with session.post(
                     url=self.endpoint,
                     data=element_string,
@@ -51,12 +79,16 @@ def process_command(func):
                     timeout=timeout,
                 ) as response:
                     response.raise_for_status()
-                    return await response.text()
+                    text = await response.text()
+                    core.report_response(time.perf_counter() - start, len(text))
+                    return text
 
         try:
-            response_text = await send_request(connector, timeout)
+            async with self.request_slots:
+                response_text = await send_request(connector, timeout)
             logger.debug(f"Response received from {self.endpoint}")
             self.failed_requests = 0
+            self.breaker.record_success()
 
             if os.path.exists(core.PARENT_DIRECTORY / f"{self.ip}_BMS.err"):
                 logger.info(f"Removing {self.ip}_BMS.err")
@@ -67,20 +99,15 @@ def process_command(func):
 
         except Exception as e:
             logger.warning(f"Final failure after {self.retries} retries: {e}")
+            self.breaker.record_failure()
             await asyncio.sleep(sleep)
             self.failed_requests += 1
 
-            if general_settings.get(
-                "use_err_files", False
-            ) and self.failed_requests > general_settings.get(
-                f"fail_connection_number"
+            if (
+                general_settings.get("use_err_files", False)
+                and self.connection_failed()
             ):
-                logger.warning(f"Writing {self.ip}_BMS.err")
-                path_obj = core.PARENT_DIRECTORY / f"{self.ip}_BMS.err"
-                try:
-                    path_obj.touch()
-                except Exception as e:
-                    logger.error(f"Cannot touch {self.ip}_BMS.err file: {e}")
+                self.write_err_file()
 
             return {
                 "@action": action,
@@ -89,6 +116,8 @@ def process_command(func):
 
         try:
             await asyncio.sleep(sleep)
+            if action in POINT_RESPONSES:
+                return decode_point_response(action, response_text)
             return xtd.parse(response_text)["resp"]
         except Exception as e:
             logger.error(f"Parsing error: {e}")
@@ -110,6 +139,32 @@ class DanfossXMLInterface:
         self.timeout = general_settings.get("http_timeout_delay", 3)
         self.retries = general_settings.get("http_retry_count", 3)
         self.failed_requests: int = 0
+        self.max_concurrent_requests: int = general_settings.get(
+            "danfoss_max_concurrent_requests", 2
+        )
+        self.request_slots = asyncio.Semaphore(self.max_concurrent_requests)
+        self.breaker = core.CircuitBreaker(
+            f"Danfoss {ip}",
+            failure_threshold=general_settings.get("breaker_failure_threshold", 3),
+            reset_seconds=general_settings.get("breaker_reset_seconds", 300),
+        )
+
+        # A breaker open this long counts as a failed connection, as long as
+        # fail_connection_number failed requests with retries would take
+        self.fail_connection_number: int = general_settings.get(
+            "fail_connection_number", 100
+        )
+        self.dead_after_seconds: float = (
+            self.fail_connection_number
+            * self.retries
+            * (self.timeout + general_settings.get("http_request_delay", 3))
+        )
+
+        # (command, scope): (version, {rest of body_key: (action, body)}),
+        # least recently used first. Chunk boundaries move as chunk sizes
+        # adapt, so each scope keeps at most max_bodies_per_scope bodies.
+        self.request_bodies: dict[tuple[str, Any], tuple[Any, OrderedDict]] = {}
+        self.max_bodies_per_scope: int = 256
 
         self.http_headers = {
             "Connection": "close",
@@ -121,6 +176,58 @@ class DanfossXMLInterface:
             "units": "U",
         }
 
+    def connection_failed(self) -> bool:
+        """
+        Whether the panel counts as unreachable for the err file and the hard
+        stop: too many failed requests in a row, or a breaker open for
+        dead_after_seconds.
+        """
+        return (
+            self.failed_requests > self.fail_connection_number
+            or self.breaker.open_seconds() > self.dead_after_seconds
+        )
+
+    def write_err_file(self):
+        logger.warning(f"Writing {self.ip}_BMS.err")
+        path_obj = core.PARENT_DIRECTORY / f"{self.ip}_BMS.err"
+        try:
+            path_obj.touch()
+        except Exception as e:
+            logger.error(f"Cannot touch {self.ip}_BMS.err file: {e}")
+
+    def cached_body(self, command: str, body_key: tuple | None):
+        """
+        Look up a request body built earlier for the same body_key.
+
+        A body_key is (scope, version, *rest) where the caller guarantees the
+        same key always builds the same body, e.g. the address set of one
+        nodetype at one version of the point index.
+        """
+        if body_key is None:
+            return None
+        scope, version, *rest = body_key
+        cached = self.request_bodies.get((command, scope))
+        if cached is None or cached[0] != version:
+            return None
+        body = cached[1].get(tuple(rest))
+        if body is not None:
+            cached[1].move_to_end(tuple(rest))
+        return body
+
+    def store_body(self, command: str, body_key: tuple | None, action: str, body: str):
+        if body_key is None:
+            return
+        scope, version, *rest = body_key
+        cached = self.request_bodies.get((command, scope))
+        if cached is None or cached[0] != version:
+            # Bodies of older versions of this scope can never be used again
+            cached = (version, OrderedDict())
+            self.request_bodies[(command, scope)] = cached
+        cached[1][tuple(rest)] = (action, body)
+        cached[1].move_to_end(tuple(rest))
+        while len(cached[1]) > self.max_bodies_per_scope:
+            cached[1].popitem(last=False)
+
     @process_command
     def read_dummy(self) -> ET.Element:
         return ET.Element(
@@ -129,6 +236,7 @@ class DanfossXMLInterface:
             action="read_dummy",
         )
 
+    @core.single_flight(SINGLE_FLIGHT_TTL)
     @process_command
     def read_units(self) -> ET.Element:
         return ET.Element(
@@ -214,6 +322,7 @@ class DanfossXMLInterface:
             id=str(id),
         )
 
+    @core.single_flight(SINGLE_FLIGHT_TTL)
     @process_command
     def schedule_summary(self) -> ET.Element:
         return ET.Element(
@@ -222,6 +331,7 @@ class DanfossXMLInterface:
             action="schedule_summary",
         )
 
+    @core.single_flight(SINGLE_FLIGHT_TTL)
     @process_command
     def read_store_schedule(self) -> ET.Element:
         return ET.Element(
@@ -289,6 +399,9 @@ class DanfossXMLInterface:
             action="read_holidays",
         )
 
+    # Re-polled every update cycle for live values, so only requests in
+    # flight are shared
+    @core.single_flight()
     @process_command
     def read_suction_group(self, rack_id: int, suction_id: int) -> ET.Element:
         return ET.Element(
@@ -299,6 +412,7 @@ class DanfossXMLInterface:
             suction_id=str(suction_id),
         )
 
+    @core.single_flight()
     @process_command
     def read_circuit(
         self, rack_id: int, suction_id: int, circuit_id: int
@@ -312,6 +426,7 @@ class DanfossXMLInterface:
             circuit_id=str(circuit_id),
         )
 
+    @core.single_flight()
     @process_command
     def read_condenser(self, rack_id: int) -> ET.Element:
         return ET.Element(
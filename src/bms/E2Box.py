@@ -69,9 +69,9 @@ class E2Box:
         self.controllers: list[Controller] = []
         self.initialized: bool = False
 
-    def get_controllers(self):
+    async def get_controllers(self):
         logger.info(f"{self.name} is getting controllers")
-        result = self.socket_interface.get_controllers()
+        result = await self.socket_interface.get_controllers()
 
         self.controllers: list[Controller] = []
         if isinstance(result, bytes):
@@ -95,12 +95,14 @@ class E2Box:
         else:
             logger.error(f"{self.name} could not update controller list")
 
-    def get_cells_and_apps(self, controller: Controller):
+    async def get_cells_and_apps(self, controller: Controller):
 
         if self.controllers == []:
-            self.get_controllers()
+            await self.get_controllers()
 
-        result = self.socket_interface.get_cells_and_apps(controller.controller_number)
+        result = await self.socket_interface.get_cells_and_apps(
+            controller.controller_number
+        )
 
         if not isinstance(result, bytes):
             return []
@@ -158,7 +160,7 @@ class E2Box:
                     data.append(record)
         return data
 
-    def get_cell_statuses(self):
+    async def get_cell_statuses(self):
         all_cells = [
             cell
             for controller in self.controllers
@@ -167,16 +169,16 @@ class E2Box:
         ]
 
         for cell in all_cells:
-            self.get_cell_status(cell)
+            await self.get_cell_status(cell)
 
-    def get_cell_status(self, cell: Cell):
+    async def get_cell_status(self, cell: Cell):
         for k, v in E2_PROPERTIES.get(cell.parent_cell_type.name, {}).items():
             if k in cell.data.keys() and str(cell.data[k])[0:4] == "-858":
                 logger.debug(f"Skipping {k}, not active")
                 continue
 
             logger.info(f"Getting {v} for cell {cell.name}")
-            resp = self.socket_interface.get_cell_status(
+            resp = await self.socket_interface.get_cell_status(
                 cell.parent_controller.controller_number,
                 cell.cell_address,
                 [k],
@@ -189,11 +191,11 @@ class E2Box:
             except Exception as e:
                 logger.error(f"Could not read data: {e}")
 
-    def initialize(self):
+    async def initialize(self):
         logger.info(f"Initializing E2 controllers")
-        self.get_controllers()
+        await self.get_controllers()
         for controller in self.controllers:
-            self.get_cells_and_apps(controller)
+            await self.get_cells_and_apps(controller)
         self.initialized = True
 
     def print_hierarchy(self):
@@ -0,0 +1,595 @@
+"""
+Property map of the E2 cell types polled over the HTTP interface.
+
+The table is kept packed, one tab separated "celltype, property_index,
+property_name" row per line sorted by celltype, and only parsed into a
+CelltypeIndex the first time an E2 is polled.
+"""
+
+import functools
+
+CELLTYPE_TABLE = """\
+1	2048.0	OUTPUT
+2	2048.0	OUTPUT
+32	1.0	INPUT
+33	1.0	INPUT
+36	1.0	INPUT
+65	2048.0	OUTPUT
+65	4.0	ANALOG INPUT1
+65	6.0	ANALOG INPUT3
+65	2050.0	Num Inputs
+65	5.0	ANALOG INPUT2
+66	17.0	DIG INPUT15
+66	9.0	DIG INPUT7
+66	7004.0	Num Inputs
+66	14.0	DIG INPUT12
+66	20.0	INVERT OUTPUT
+66	2048.0	OUTPUT
+66	16.0	DIG INPUT14
+66	18.0	DIG INPUT16
+66	12.0	DIG INPUT10
+66	5.0	DIG INPUT3
+66	13.0	DIG INPUT11
+66	3.0	DIG INPUT1
+66	10.0	DIG INPUT8
+66	15.0	DIG INPUT13
+66	11.0	DIG INPUT9
+66	7.0	DIG INPUT5
+66	6.0	DIG INPUT4
+66	2051.0	NUM INPUTS ON
+66	7002.0	Comb Method
+66	8.0	DIG INPUT6
+66	4.0	DIG INPUT2
+67	14.0	DI6
+67	2054.0	DO2
+67	16.0	DI8
+67	12.0	DI4
+67	2.0	AI2
+67	15.0	DI7
+67	4.0	AI4
+67	2050.0	AO2
+67	10.0	DI2
+67	2056.0	DO4
+67	2049.0	AO1
+67	2051.0	AO3
+67	3.0	AI3
+67	2052.0	AO4
+67	1.0	AI1
+67	11.0	DI3
+67	5.0	AI5
+67	9.0	DI1
+67	8.0	AI8
+67	7.0	AI7
+67	6.0	AI6
+67	13.0	DI5
+67	2053.0	DO1
+67	2055.0	DO3
+80	2048.0	OUTPUT
+80	2049.0	SCHED OUTPUT
+80	2050.0	DAY SCHED OUT
+82	1.0	COMP RUN IN
+82	2091.0	POWER FACTOR
+82	2049.0	COMP RUN PROOF
+82	2092.0	POWER CONSUMPT
+82	2.0	SUCTION PRES IN
+86	2049.0	PRESENT KW
+86	2054.0	DAILY KWH
+86	2053.0	HOURLY KWH
+87	2056.0	DAILY TOTAL
+87	2059.0	DAILY PEAK
+87	2058.0	HOURLY PEAK
+87	2055.0	HOURLY TOTAL
+87	2053.0	TOTAL
+91	2.0	OUTDOOR HUMID
+91	1.0	OUTDOOR TEMP
+94	16.0	CUTOUT
+94	14.0	CUTIN
+94	19.0	INPUT2
+94	20.0	INPUT3
+94	5.0	BYPASS VALUE
+94	18.0	INPUT1
+94	22.0	INPUT SELECT
+94	21.0	INPUT4
+94	2049.0	CONTROL VALUE
+94	2048.0	COMMAND OUT
+96	15.0	LOGIC IN3
+96	13.0	LOGIC IN1
+96	2048.0	COMMAND OUT
+96	2060.0	NUM INPUTS ON
+96	4.0	BYPASS VALUE
+96	2053.0	CONTROL VALUE
+96	14.0	LOGIC IN2
+96	16.0	LOGIC IN4
+97	3.0	PRESSURE IN
+97	7000.0	Conversion Type
+97	2051.0	TEMP OUT
+97	7001.0	Refrig Type
+97	7003.0	Use Abs Pressure
+98	15.0	ALL LIGHTS ON
+98	22.0	DAY SCHED IN
+98	2053.0	IN BYPASS
+98	13.0	BYPASS ON
+98	2048.0	LIGHTS OUTPUT
+98	2054.0	ACTIVE SCHED
+98	1.0	LIGHT LEVEL IN
+103	2048.0	DIG INPUT 1
+103	1.0	RELAY OUT 1
+103	2.0	RELAY OUT 2
+103	2049.0	DIG INPUT 2
+126	2048.0	STATUS
+129	78.0	DROPLEG PRES
+129	2059.0	FAN OUT8
+129	2101.0	DISCHARGE OUT
+129	19.0	FAN PROOF IN11
+129	2098.0	FST REC VAL OUT
+129	16.0	FAN PROOF IN8
+129	7001.0	Number of Fans
+129	2102.0	CONTROL METHOD
+129	2057.0	FAN OUT6
+129	2058.0	FAN OUT7
+129	10.0	FAN PROOF IN2
+129	9.0	FAN PROOF IN1
+129	2061.0	FAN OUT10
+129	65.0	MIN TEMP STPT
+129	8.0	SHUT DOWN
+129	2056.0	FAN OUT5
+129	74.0	LIQUID LEVEL
+129	2062.0	FAN OUT11
+129	2076.0	VS RPM
+129	4.0	DISCH TRIP IN
+129	2060.0	FAN OUT9
+129	11.0	FAN PROOF IN3
+129	2100.0	REFRIG TEMP OUT
+129	40.0	AMB SPLIT STPT
+129	5.0	AMB TEMP IN
+129	17.0	FAN PROOF IN9
+129	2077.0	SPLIT VALVE
+129	2053.0	FAN OUT2
+129	15.0	FAN PROOF IN7
+129	13.0	FAN PROOF IN5
+129	2099.0	FST REC SP OUT
+129	2052.0	FAN OUT1
+129	2095.0	REFG TYPE OUT
+129	77.0	DROPLEG TEMP
+129	2.0	PRES CTRL IN
+129	20.0	FAN PROOF IN12
+129	3.0	PRES CTRL STPT
+129	12.0	FAN PROOF IN4
+129	2054.0	FAN OUT3
+129	2063.0	FAN OUT12
+129	2051.0	VS FAN OUT
+129	2055.0	FAN OUT4
+129	73.0	VS FREQ
+129	42.0	UNSPLIT STPT
+129	6.0	TEMP DIF STPT
+129	14.0	FAN PROOF IN6
+129	18.0	FAN PROOF IN10
+131	33.0	PRODUCT TEMP 5
+131	34.0	PRODUCT TEMP 6
+131	2054.0	DEFROST
+131	2071.0	CASE ALM LO SP
+131	41.0	CASE TEMP 12
+131	43.0	PRODUCT TEMP 8
+131	4.0	CASE TEMP 2
+131	2067.0	CASE ALM OUT 5
+131	45.0	PRODUCT TEMP 10
+131	2051.0	EEPR VALVE
+131	37.0	CASE TEMP 8
+131	2068.0	CASE ALM OUT 6
+131	2058.0	ALARM OUT
+131	36.0	CASE TEMP 7
+131	7026.0	Defrost Time 1
+131	9.0	CASE TEMP STPT
+131	7.0	CASE TEMP 5
+131	2065.0	CASE ALM OUT 3
+131	47.0	PRODUCT TEMP 12
+131	10.0	DUAL TEMP STPT
+131	32.0	PRODUCT TEMP 4
+131	39.0	CASE TEMP 10
+131	7028.0	Defrost Time 3
+131	5.0	CASE TEMP 3
+131	2056.0	FAN
+131	7031.0	Defrost Time 6
+131	8.0	CASE TEMP 6
+131	7030.0	Defrost Time 5
+131	30.0	PRODUCT TEMP 2
+131	2049.0	ACTIVE SETPT
+131	2050.0	REFRIG SOLENOID
+131	42.0	PRODUCT TEMP 7
+131	2064.0	CASE ALM OUT 2
+131	40.0	CASE TEMP 11
+131	3.0	CASE TEMP 1
+131	24.0	TERM TEMP SP
+131	46.0	PRODUCT TEMP 11
+131	29.0	PRODUCT TEMP 1
+131	7027.0	Defrost Time 2
+131	2063.0	CASE ALM OUT 1
+131	2048.0	CIRCUIT STATE
+131	44.0	PRODUCT TEMP 9
+131	2066.0	CASE ALM OUT 4
+131	31.0	PRODUCT TEMP 3
+131	38.0	CASE TEMP 9
+131	6.0	CASE TEMP 4
+131	2052.0	CONTROL TEMP
+131	7029.0	Defrost Time 4
+131	2070.0	CASE ALM HI SP
+131	2055.0	PEAK DEF TEMP
+132	4.0	TEMPERATURE
+132	2048.0	OUTPUT
+132	2049.0	DEWPOINT OUT
+132	5.0	REL HUMIDITY
+132	7.0	FULL OFF DEWPT
+132	3.0	DEWPOINT IN
+132	6.0	FULL ON DEWPT
+134	2069.0	OCC STATE
+134	7.0	SPACE HUMID
+134	2073.0	FAN FAILED
+134	6.0	SPACE TEMP 1
+134	15.0	FAN PROOF IN
+134	2.0	OCCUPANCY
+134	2077.0	VS FAN OUTPUT
+134	24.0	WINTER COOL OCC
+134	7047.0	Fan Type
+134	23.0	WINTER HEAT UOC
+134	7000.0	Control Type
+134	7013.0	Dehumidify By
+134	2074.0	VS INVTR FAIL
+134	3.0	APPARENT TMP EN
+134	2083.0	SUM WNTR MODE
+134	22.0	WINTER HEAT OCC
+134	54.0	SUM WNTR IN
+134	2082.0	SS FAN OUT
+134	19.0	SUMMER HEAT UOC
+134	8.0	SUPPLY TEMP
+134	2052.0	HEAT STAGE3
+134	2053.0	HEAT STAGE4
+134	18.0	SUMMER HEAT OCC
+134	2051.0	HEAT STAGE2
+134	2050.0	HEAT STAGE1
+134	11.0	OUTDOOR HUMID
+134	25.0	WINTER COOL UOC
+134	20.0	SUMMER COOL OCC
+134	7001.0	Controlled By
+134	2058.0	COOL STAGE1
+134	48.0	PHASE LOSS
+134	21.0	SUMMER COOL UOC
+134	2059.0	COOL STAGE2
+134	2068.0	ACT DEHUM SETPT
+134	2066.0	HEAT COOL MODE
+134	12.0	RETURN TEMP
+134	2067.0	ACTIVE SETPT
+134	2070.0	APPARENT TEMP
+134	10.0	OUTDOOR TEMP
+135	2049.0	ZONE HUM OUT
+135	2062.0	ACTIVE CL STPT
+135	2048.0	ZONE TEMP OUT
+135	2057.0	SUM WNTR MODE
+135	2.0	OCCUPANCY
+135	2061.0	ACTIVE HT STPT
+139	2067.0	DISCHARGE AIR1
+139	2065.0	TERM TEMP
+139	2068.0	DISCHARGE AIR2
+139	2070.0	DISCHARGE AIR4
+139	2054.0	DOOR STATE
+139	2049.0	LIGHT STATE
+139	2052.0	CASE MODE
+139	2061.0	ACTIVE CASE SP
+139	12.0	CASE TEMP SP
+139	7.0	DEW POINT
+139	2064.0	VALVE POS
+139	2074.0	DEFR TERM TEMP1
+139	2069.0	DISCHARGE AIR3
+139	2063.0	CASE TEMP
+142	2075.0	FAN RUN PCT
+142	2057.0	COOL4
+142	7099.0	Num Heat Stages
+142	2076.0	COOL RUN PCT1
+142	2083.0	HEAT RUN PCT4
+142	2056.0	COOL3
+142	2068.0	SUPPLY TEMP
+142	2067.0	SPACE TEMP
+142	2079.0	COOL RUN PCT4
+142	12.0	ECONOMIZE
+142	2074.0	CONTROL TEMP
+142	2080.0	HEAT RUN PCT1
+142	2053.0	HEAT4
+142	4.0	OUTDOOR TEMP
+142	24.0	OA DAMPER POS
+142	7100.0	Num Cool Stages
+142	2055.0	COOL2
+142	2082.0	HEAT RUN PCT3
+142	9.0	UNOCC COOL
+142	2050.0	HEAT1
+142	2054.0	COOL1
+142	11.0	SEASON
+142	14.0	ZONE TEMP
+142	2077.0	COOL RUN PCT2
+142	6.0	OCC HEAT
+142	2049.0	FAN
+142	2069.0	RETURN TEMP
+142	10.0	ZONE OCC
+142	2051.0	HEAT2
+142	2078.0	COOL RUN PCT3
+142	8.0	OCC COOL
+142	2081.0	HEAT RUN PCT2
+142	2052.0	HEAT3
+142	7.0	UNOCC HEAT
+142	2072.0	OCCUPANCY
+158	6.0	VALVE % 6
+158	8.0	VALVE % 8
+158	7.0	VALVE % 7
+158	4.0	VALVE % 4
+158	1.0	VALVE % 1
+158	3.0	VALVE % 3
+158	5.0	VALVE % 5
+158	2.0	VALVE % 2
+162	2141.0	STAGE STATUS4
+162	2138.0	STAGE STATUS1
+162	2142.0	STAGE STATUS5
+162	92.0	FLT TARGET TEMP
+162	2089.0	RACK FAIL
+162	2146.0	STAGE STATUS9
+162	2048.0	STAGE OUT1
+162	2129.0	TOTAL STAGES
+162	17.0	COMP DIG OIL9
+162	21.0	COMP DIG OIL13
+162	8.0	SUCT TEMP SETPT
+162	2049.0	STAGE OUT2
+162	2143.0	STAGE STATUS6
+162	3.0	SUCTION STEPUP
+162	42.0	COMP PROOF2
+162	2060.0	STAGE OUT13
+162	2090.0	SAT SUCT TEMP
+162	53.0	COMP PROOF13
+162	2056.0	STAGE OUT9
+162	7002.0	Refrigerant
+162	47.0	COMP PROOF7
+162	64.0	FLOAT ENABLE
+162	59.0	PHASE LOSS
+162	2150.0	STAGE STATUS13
+162	19.0	COMP DIG OIL11
+162	2095.0	CUR TEMP SETPT
+162	2144.0	STAGE STATUS7
+162	18.0	COMP DIG OIL10
+162	52.0	COMP PROOF12
+162	2067.0	SUBCOOLER
+162	9.0	COMP DIG OIL1
+162	2057.0	STAGE OUT10
+162	2052.0	STAGE OUT5
+162	2094.0	CUR PRES SETPT
+162	12.0	COMP DIG OIL4
+162	43.0	COMP PROOF3
+162	7.0	DISCHARGE PRES
+162	14.0	COMP DIG OIL6
+162	2061.0	STAGE OUT14
+162	54.0	COMP PROOF14
+162	2152.0	STAGE STATUS15
+162	50.0	COMP PROOF10
+162	49.0	COMP PROOF9
+162	2059.0	STAGE OUT12
+162	2136.0	FILTERED PRES
+162	41.0	COMP PROOF1
+162	2.0	SUCTION TEMP
+162	2135.0	CUR SUPERHEAT
+162	1.0	SUCTION PRES
+162	2051.0	STAGE OUT4
+162	24.0	COMP DIG OIL16
+162	2148.0	STAGE STATUS11
+162	2054.0	STAGE OUT7
+162	5.0	FLOAT TEMP
+162	68.0	EMERGENCY OVR
+162	2145.0	STAGE STATUS8
+162	11.0	COMP DIG OIL3
+162	56.0	COMP PROOF16
+162	15.0	COMP DIG OIL7
+162	46.0	COMP PROOF6
+162	44.0	COMP PROOF4
+162	13.0	COMP DIG OIL5
+162	2151.0	STAGE STATUS14
+162	2149.0	STAGE STATUS12
+162	2063.0	STAGE OUT16
+162	2131.0	GROUP LLSV
+162	2062.0	STAGE OUT15
+162	6.0	SUCT PRES SETPT
+162	23.0	COMP DIG OIL15
+162	10.0	COMP DIG OIL2
+162	2128.0	STAGES ACTIVE
+162	51.0	COMP PROOF11
+162	2153.0	STAGE STATUS16
+162	48.0	COMP PROOF8
+162	2140.0	STAGE STATUS3
+162	16.0	COMP DIG OIL8
+162	2147.0	STAGE STATUS10
+162	55.0	COMP PROOF15
+162	2053.0	STAGE OUT6
+162	63.0	FLOAT CKT STATE
+162	86.0	SUCT MON TEMP
+162	2055.0	STAGE OUT8
+162	45.0	COMP PROOF5
+162	2050.0	STAGE OUT3
+162	2139.0	STAGE STATUS2
+162	20.0	COMP DIG OIL12
+162	2058.0	STAGE OUT11
+162	22.0	COMP DIG OIL14
+169	2052.0	ACTIVE SP
+169	2054.0	VALVE PCT
+169	2053.0	TERM TEMP
+169	8.0	CASE TEMP SP
+169	2062.0	DISCH 3
+169	7010.0	AntiSwt HI Stpt
+169	2051.0	CASE TEMP
+169	2057.0	ANTISWEAT PCT
+169	7087.0	Disch 4 Offs
+169	7045.0	Ref Leak Detect
+169	7083.0	Disch 2 Offs
+169	2065.0	ANTISWEAT PCT
+169	2067.0	REFG LEAK
+169	7091.0	Refr Leak Offs
+169	2058.0	DISCH 2
+169	2056.0	DISCH 1
+169	7085.0	Disch 3 Offs
+169	2064.0	DISCH 4
+169	7009.0	AntiSwt LO Stpt
+169	7081.0	Disch 1 Offs
+170	2073.0	E2 DEWPT
+171	2129.0	POWER FACTOR
+171	7.0	CAPCITY REQ IN
+171	2050.0	DSCH TEMP OUT
+171	2048.0	COMP RUN OUT
+171	10.0	SAT SUCT TEMP
+171	2051.0	SAT TEMP OUT
+171	2049.0	COMP RUN PROOF
+171	2060.0	COMP STARTS
+171	2130.0	POWER CONSUMPT
+171	11.0	SUCTION PRES IN
+171	2127.0	COMP CURRENT
+342	2049.0	CONCENTRATION2
+342	2061.0	CONCENTRATION14
+342	2052.0	CONCENTRATION5
+342	2067.0	ZER PKPK
+342	2070.0	AMBIENT PRES
+342	2062.0	CONCENTRATION15
+342	2069.0	VACUUM PRES
+342	2066.0	AVERAGE PKPK
+342	2053.0	CONCENTRATION6
+342	2050.0	CONCENTRATION3
+342	2059.0	CONCENTRATION12
+342	2051.0	CONCENTRATION4
+342	2054.0	CONCENTRATION7
+342	2055.0	CONCENTRATION8
+342	2065.0	PKPK
+342	2056.0	CONCENTRATION9
+342	2060.0	CONCENTRATION13
+342	2058.0	CONCENTRATION11
+342	2048.0	CONCENTRATION1
+342	2057.0	CONCENTRATION10
+342	2064.0	TEMPERATURE
+342	2068.0	PRESSURE
+342	2063.0	CONCENTRATION16
+343	2054.0	COMP RUNNING
+343	2094.0	TOTAL STARTS
+343	2052.0	DISCH LINE TEMP
+343	2050.0	PROOF OUT
+343	2095.0	ACT RUN OUT
+371	2059.0	COMP C SUC PSI
+371	2058.0	COMP B SUC PSI
+371	2048.0	OAT
+371	2060.0	COMD D SUC PSI
+371	2075.0	AUX HT STG 2
+371	2055.0	COMP C DS PSI
+371	2080.0	SUPPLY DEWPOINT
+371	2063.0	SUPPLY FN FAULT
+371	2050.0	SUPPLY TEMP
+371	2076.0	AUX HT STG 3
+371	2071.0	COMP B
+371	2062.0	SUPPLY FN %
+371	7.0	HEAT STG 2 SPT
+371	2056.0	COMD D DS PSI
+371	2052.0	INDOOR DEWPOINT
+371	2057.0	COMP A SUC PSI
+371	6.0	HEAT STG 1 SPT
+371	2053.0	COMP A DS PSI
+371	2054.0	COMP B DS PSI
+371	2064.0	COMP FAULT
+371	2074.0	AUX HT STG 1
+371	9.0	HEAT STG 4 SPT
+371	8.0	HEAT STG 3 SPT
+371	2072.0	COMP C
+371	2.0	ZONE DH SETPT
+371	10.0	ZONE HEAT SETPT
+371	2070.0	COMP A
+371	2077.0	AUX HT STG 4
+371	2073.0	COMP D
+371	4.0	ZONE COOL SETPT
+425	2098.0	OA DAMPER %
+425	2087.0	COMP 1 STAT %
+425	2109.0	COND FAN 6
+425	2102.0	REHEAT1 ACTIVE
+425	7138.0	UNOCC DEWPT SP
+425	2089.0	COMP 2 STAT
+425	2100.0	RECLAIM1 ACTIVE
+425	2051.0	SPACE TEMP
+425	2056.0	SUPPLY AIR TEMP
+425	2108.0	COND FAN 5
+425	7136.0	UNOCC HEAT SP
+425	2093.0	HEAT STAGE 2
+425	2101.0	RECLAIM2 ACTIVE
+425	2095.0	HEAT STAGE 4
+425	2084.0	SPLY FAN STAT %
+425	2061.0	MIXED AIR TEMP
+425	2126.0	OUTDR HUMIDITY
+425	2050.0	HEAT MODE
+425	2048.0	DEHUM MODE
+425	2062.0	CO2 LEVEL
+425	2085.0	COMP CAPACITY%
+425	2094.0	HEAT STAGE 3
+425	2110.0	SUC PSI SP GP 1
+425	2125.0	INDR HUMIDITY
+425	2096.0	RA DAMPER %
+425	2053.0	RETURN AIR TEMP
+425	7137.0	OCC DEPT SP
+425	2107.0	COND FAN 4
+425	2090.0	COMP 3 STAT
+425	2066.0	LOAD SHED
+425	2127.0	SPACE DEWPOINT
+425	2065.0	CLOGGED FILTER
+425	2121.0	# of Compressor
+425	2106.0	COND FAN 3
+425	2091.0	COMP 4 STAT
+425	2049.0	COOL MODE
+425	2103.0	REHEAT2 ACTIVE
+425	2119.0	SUPPLY HEAT SP
+425	7134.0	UNOCC COOL SP
+425	7133.0	OCC COOL SP
+425	2111.0	SUC PSI SP GP 2
+425	2104.0	COND FAN 1
+425	7135.0	OCC HEAT SP
+425	2097.0	BA DAMPER %
+425	2088.0	COMP 2 STAT %
+425	2105.0	COND FAN 2
+425	2086.0	HEAT CAPACITY%
+425	2092.0	HEAT STAGE 1
+425	2054.0	OUTDR AIR TEMP
+425	2128.0	OUTDR AIR DEWPT
+431	7128.0	MOTOR_FLA
+431	7132.0	MOTOR_PWR_FACTR
+431	2072.0	OUT_FREQ_
+431	2074.0	CURRENT_TORQUE
+431	2063.0	ENERGY_KW/H
+"""
+
+
+class CelltypeIndex:
+    """Lookups compiled from CELLTYPE_TABLE."""
+
+    __slots__ = ("_properties", "_names")
+
+    def __init__(self, table: str):
+        self._properties: dict[str, tuple[str, ...]] = {}
+        self._names: dict[tuple[str, str], str] = {}
+        rows = [line.split("\t") for line in table.splitlines()]
+        start = 0
+        for end in range(1, len(rows) + 1):
+            # Rows are sorted by celltype, so each celltype is one run
+            if end < len(rows) and rows[end][0] == rows[start][0]:
+                continue
+            celltype = rows[start][0]
+            self._properties[celltype] = tuple(idx for _, idx, _ in rows[start:end])
+            for _, idx, name in rows[start:end]:
+                self._names[(celltype, idx)] = name
+            start = end
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def properties(self, celltype: str) -> tuple[str, ...]:
+        """Property indexes polled for a celltype, empty if it is not mapped."""
+        return self._properties.get(str(celltype), ())
+
+    def property_name(self, celltype: str, property_index: str) -> str:
+        return self._names[(str(celltype), property_index)]
+
+
+@functools.cache
+def celltype_index() -> CelltypeIndex:
+    return CelltypeIndex(CELLTYPE_TABLE)
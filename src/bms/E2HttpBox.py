@@ -1,10 +1,13 @@
 from pprint import pprint
 import logging
 import asyncio
-from .E2HttpInterface import E2HttpInterface, CELLTYPE_MAPPINGS_TABLE
+from collections.abc import Iterator
+from .E2HttpInterface import E2HttpInterface
+from .E2Celltypes import celltype_index
 from dataclasses import dataclass, field, fields, asdict
 import json
 import core
+from core import AdaptiveChunker, ChunkAborted
 
 
 logger = logging.getLogger(__name__)
@@ -13,7 +16,43 @@ with open(core.GENERAL_SETTINGS, "r") as f:
     general_settings = json.load(f)
 
 
-@dataclass
+# Response entry fields kept on a Point
+POINT_FIELDS = (
+    "alarm",
+    "bypasstime",
+    "dataType",
+    "engUnits",
+    "fail",
+    "notice",
+    "override",
+    "ovtime",
+    "ovtype",
+    "value",
+)
+
+# Poll tiers of e2_property_tiers: every N cycles, discovery only, excluded
+DISCOVERY_ONLY = 0
+EXCLUDED = -1
+
+
+def property_tier(tiers: dict, celltype, property_name: str) -> int:
+    """
+    Poll tier of a property, from the first matching key of tiers:
+    "celltype:property name", "property name", "celltype:*", then "*".
+    """
+    for key in (
+        f"{celltype}:{property_name}",
+        property_name,
+        f"{celltype}:*",
+        "*",
+    ):
+        if key in tiers:
+            tier = tiers[key]
+            return EXCLUDED if tier is None else int(tier)
+    return 1
+
+
+@dataclass(slots=True)
 class Point:
     bypasstime: str
     dataType: str
@@ -28,7 +67,7 @@ class Point:
     alarm: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class Alarm:
     acked: bool
     acktimestamp: str
@@ -52,7 +91,7 @@ class Alarm:
     unacked: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class Cell:
     celllongname: str
     cellname: str
@@ -62,6 +101,11 @@ class Cell:
     points: dict[str, Point] = field(default_factory=dict)
 
 
+# Flat field names, for emitting rows without asdict
+POINT_KEYS = tuple(f.name for f in fields(Point))
+ALARM_KEYS = tuple(f.name for f in fields(Alarm))
+
+
 @dataclass
 class Controller:
     model: str
@@ -71,7 +115,8 @@ class Controller:
     type: str
     subnet: int
     cells: list[Cell] = field(default_factory=list)
-    alarms: list[Alarm] = field(default_factory=list)
+    # advid: active alarm
+    alarms: dict[int, Alarm] = field(default_factory=dict)
 
 
 class E2HttpBox:
@@ -82,12 +127,30 @@ class E2HttpBox:
         self.controllers: list[Controller] = []
         self.initialized: bool = False
         self.max_buffer_size: int = general_settings.get("e2_buffer_length", 75)
+        # "controller:cell:property_index": (controller, cell, property name)
+        self.prop_index: dict[str, tuple[Controller, Cell, str]] = {}
+        # Alarms new, changed or returned to normal since the last sent frame,
+        # keyed by (controller, advid)
+        self.alarm_changes: dict[tuple[str, int], tuple[Controller, Alarm, bool]] = {}
+        # The alarm changes read by the last get_data or get_rows
+        self.emitted_alarms: dict[tuple[str, int], tuple[Controller, Alarm, bool]] = {}
+        self.property_tiers: dict = general_settings.get("e2_property_tiers", {})
+        # Poll tier: requested properties, and buffered polls since discovery
+        self.poll_tiers: dict[int, list[str]] = {}
+        self.cycle: int = 0
+        self.chunker: AdaptiveChunker | None = None
 
     async def initialize(self):
         await self.get_cells()
         self.initialized = True
 
-    def get_data(self):
+    def get_data(self, full_frame: bool = False):
+        """
+        Records of every cell, and of the alarms that changed since the last
+        sent frame, with "cleared" set on alarms that returned to normal. A
+        full frame carries every active alarm instead. The alarm changes stay
+        queued until clear_alarm_changes.
+        """
         logger.info(f"Fetching data")
         data = []
         for controller in self.controllers:
@@ -103,19 +166,128 @@ class E2HttpBox:
                     record[k] = asdict(v)
                 data.append(record)
 
-            for alarm in controller.alarms:
-                record = {
-                    "@nodetype": "E2",
-                    "@node": controller.name,
-                    "@mod": controller.revision,
-                    "@point": f"alarm_{alarm.advid}",
-                    "ip": self.ip,
-                }
-                for k, v in asdict(alarm).items():
-                    record[k] = v
-                data.append(record)
+        for controller, alarm, cleared in self.pending_alarms(full_frame):
+            record = {
+                "@nodetype": "E2",
+                "@node": controller.name,
+                "@mod": controller.revision,
+                "@point": f"alarm_{alarm.advid}",
+                "ip": self.ip,
+            }
+            for k, v in asdict(alarm).items():
+                record[k] = v
+            record["cleared"] = cleared
+            data.append(record)
         return data
 
+    def get_rows(self, full_frame: bool = False) -> Iterator[tuple]:
+        """
+        The records of get_data, already flattened into
+        (nodetype, node, mod, point, ip, key, value) rows.
+        """
+        for controller in self.controllers:
+            for cell in controller.cells:
+                for name, point in cell.points.items():
+                    for k in POINT_KEYS:
+                        yield (
+                            "E2",
+                            controller.name,
+                            controller.revision,
+                            cell.cellname,
+                            self.ip,
+                            f"{name}__{k}",
+                            getattr(point, k),
+                        )
+
+        for controller, alarm, cleared in self.pending_alarms(full_frame):
+            row = ("E2", controller.name, controller.revision, f"alarm_{alarm.advid}")
+            for k in ALARM_KEYS:
+                yield (*row, self.ip, k, getattr(alarm, k))
+            yield (*row, self.ip, "cleared", cleared)
+
+    def pending_alarms(self, full_frame: bool) -> list[tuple[Controller, Alarm, bool]]:
+        """
+        The queued alarm changes, or for a full frame every active alarm and
+        the queued returned-to-normal ones. Remembers which queued changes
+        went out, for clear_alarm_changes.
+        """
+        if full_frame:
+            pending = {
+                (controller.name, advid): (controller, alarm, False)
+                for controller in self.controllers
+                for advid, alarm in controller.alarms.items()
+            }
+            pending.update(
+                (key, change) for key, change in self.alarm_changes.items() if change[2]
+            )
+        else:
+            pending = dict(self.alarm_changes)
+
+        self.emitted_alarms = {
+            key: change
+            for key, change in self.alarm_changes.items()
+            if key in pending and pending[key][1:] == change[1:]
+        }
+        return list(pending.values())
+
+    def clear_alarm_changes(self):
+        """
+        Drop the alarm changes read by the last get_data or get_rows, once
+        their frame was sent. Changes queued since then are kept.
+        """
+        for key, change in self.emitted_alarms.items():
+            if self.alarm_changes.get(key) is change:
+                del self.alarm_changes[key]
+        self.emitted_alarms = {}
+
+    def update_alarms(self, controller: Controller, entries: list[dict]):
+        """
+        Diff a controller's alarm list against the known alarms by advid and
+        queue the new, changed and returned-to-normal ones for get_data.
+        """
+        alarms = {}
+        for each in entries:
+            alarm = Alarm(**each)
+            alarms[alarm.advid] = alarm
+
+        new = changed = 0
+        for advid, alarm in alarms.items():
+            known = controller.alarms.get(advid)
+            if known == alarm:
+                continue
+            if known is None:
+                new += 1
+            else:
+                changed += 1
+            self.alarm_changes[(controller.name, advid)] = (controller, alarm, False)
+
+        returned = [a for advid, a in controller.alarms.items() if advid not in alarms]
+        for alarm in returned:
+            self.alarm_changes[(controller.name, alarm.advid)] = (
+                controller,
+                alarm,
+                True,
+            )
+        controller.alarms = alarms
+
+        if new or changed or returned:
+            logger.info(
+                f"Alarms on {controller.name}: {new} new, {changed} changed, "
+                f"{len(returned)} returned to normal"
+            )
+
+    async def poll_alarms(self, controller: Controller):
+        logging.info(f"Getting alarms for controller {controller.name}")
+        try:
+            resp = await self.http_interface.get_alarm_list(controller.name)
+            if "result" not in resp:
+                # Keep the known alarms rather than reporting them all cleared
+                logger.warning(f"No alarm list from controller {controller.name}")
+                return
+            self.update_alarms(controller, resp["result"].get("data", []))
+        except Exception as e:
+            logger.error(f"{e}")
+
     async def get_controllers(self):
         logger.info(f"Getting controllers...")
         x = await self.http_interface.get_controller_list()
@@ -133,94 +305,107 @@ class E2HttpBox:
             logger.info(f"No controllers are known! Auto discovering controllers...")
             await self.get_controllers()
 
-        for controller in self.controllers:
-            resp = await self.http_interface.get_cell_list(controller.name)
+        responses = await self.http_interface.get_cell_lists(
+            [controller.name for controller in self.controllers]
+        )
+        for controller, resp in zip(self.controllers, responses):
             celldata = resp.get("result", {}).get("data", [])
             for cell in celldata:
                 controller.cells.append(Cell(**cell))
+        self.prop_index = {}
+        self.cycle = 0
 
     async def poll_all_buffered(self):
         if len(self.controllers) == 0:
             await self.get_cells()
 
         logger.info(f"Polling all data points using buffered requests")
-        request_list = []
         for controller in self.controllers:
-            # Get alarms
-            controller.alarms = []
-            try:
-                resp = await self.http_interface.get_alarm_list(controller.name)
-                result = resp.get("result", {}).get("data", [])
-                for each in result:
-                    controller.alarms.append(Alarm(**each))
-            except Exception as e:
-                logger.error(f"{e}")
-
-            # Get request list for all properties for all cells
-            for cell in controller.cells:
-                table = CELLTYPE_MAPPINGS_TABLE[
-                    CELLTYPE_MAPPINGS_TABLE.celltype == str(cell.celltype)
-                ]
-                request_list.extend(
-                    [
-                        f"{controller.name}:{cell.cellname}:{idx}"
-                        for idx in table.property_index.tolist()
-                    ]
-                )
-
-        # re-normalize (THIS IS REALLY JANKY, NEED TO FIX LATER)
-        for i in range(0, len(request_list), self.max_buffer_size):
-            logger.info(
-                f"{(i/len(request_list))*100:.2f}% done with fetching point data"
+            await self.poll_alarms(controller)
+
+        if not self.prop_index:
+            self.build_prop_index()
+        await self.sweep(self.due_properties())
+        self.cycle += 1
+
+    def due_properties(self) -> list[str]:
+        """
+        Properties to request this cycle: discovery-only tiers on the first
+        cycle after discovery, every-N tiers on every Nth cycle.
+        """
+        due = []
+        for tier, props in self.poll_tiers.items():
+            if tier == DISCOVERY_ONLY and self.cycle == 0:
+                due += props
+            elif tier > 0 and self.cycle % tier == 0:
+                due += props
+        return due
+
+    async def sweep(self, request_list: list[str]):
+        """
+        Request properties in adaptively sized chunks, several at a time.
+        Rejected chunks are split and retried by the chunker; a chunk without
+        any response ends the sweep.
+        """
+
+        async def fetch(chunk):
+            resp = await self.http_interface.get_multi_expanded_status_buffer(chunk)
+            if not resp:
+                raise ChunkAborted()
+            result = resp.get("result") if isinstance(resp, dict) else None
+            if not isinstance(result, dict):
+                return None
+            for entry in result.get("data", []):
+                try:
+                    self.apply_entry(entry)
+                except Exception as e:
+                    logger.error(f"Error: {e}")
+            return len(chunk)
+
+        if self.chunker is None:
+            self.chunker = AdaptiveChunker(
+                f"{self.name} GetMultiExpandedStatus",
+                initial_size=self.max_buffer_size,
+                min_size=min(10, self.max_buffer_size),
+                target_seconds=self.http_interface.timeout_seconds / 2,
             )
-            try:
-                resp = await self.http_interface.get_multi_expanded_status_buffer(
-                    request_list[i : i + self.max_buffer_size]
-                )
-                result = resp.get("result", {}).get("data", [])
-                for entry in result:
-                    prop_split = entry["prop"].split(":")
-
-                    for controller in self.controllers:
-                        if prop_split[0] == controller.name:
-                            for cell in controller.cells:
-                                if prop_split[1] == cell.cellname:
-                                    mapping = CELLTYPE_MAPPINGS_TABLE[
-                                        (
-                                            CELLTYPE_MAPPINGS_TABLE.property_index
-                                            == prop_split[2]
-                                        )
-                                    ]
-                                    mapping_specific = mapping[
-                                        mapping.celltype == str(cell.celltype)
-                                    ]
-                                    property_name = mapping_specific[
-                                        "property_name"
-                                    ].iloc[0]
-                                    point_data = {
-                                        k: v
-                                        for k, v in entry.items()
-                                        if k
-                                        in (
-                                            "alarm",
-                                            "bypasstime",
-                                            "dataType",
-                                            "engUnits",
-                                            "fail",
-                                            "notice",
-                                            "override",
-                                            "ovtime",
-                                            "ovtype",
-                                            "value",
-                                        )
-                                    }
-                                    point_data["name"] = property_name
-                                    cell.points[property_name] = Point(**point_data)
-                                    break
-
-            except Exception as e:
-                print(e)
-                logger.error(f"Error: {e}")
+        done = await self.chunker.run(
+            request_list, fetch, self.http_interface.max_concurrent_requests
+        )
+        logger.info(
+            f"Fetched {sum(done)} of {len(request_list)} properties, "
+            f"chunk size now {self.chunker.size}, "
+            f"request latency {self.http_interface.latency_summary()}"
+        )
+
+    def build_prop_index(self):
+        """
+        Index every requested property, "controller:cell:property_index", to
+        the cell and property name its response entry belongs to.
+        """
+        self.prop_index = {}
+        self.poll_tiers = {}
+        celltypes = celltype_index()
+        for controller in self.controllers:
+            for cell in controller.cells:
+                for idx in celltypes.properties(cell.celltype):
+                    prop = f"{controller.name}:{cell.cellname}:{idx}"
+                    name = celltypes.property_name(cell.celltype, idx)
+                    tier = property_tier(self.property_tiers, cell.celltype, name)
+                    # The first cell of a name wins, as in a scan of the cells
+                    if tier == EXCLUDED or prop in self.prop_index:
+                        continue
+                    self.prop_index[prop] = (controller, cell, name)
+                    self.poll_tiers.setdefault(tier, []).append(prop)
+
+    def apply_entry(self, entry: dict):
+        target = self.prop_index.get(entry.get("prop"))
+        if target is None:
+            return
+        _, cell, property_name = target
+        point_data = {k: v for k, v in entry.items() if k in POINT_FIELDS}
+        point_data["name"] = property_name
+        cell.points[property_name] = Point(**point_data)
 
     async def poll_all(self):
         if len(self.controllers) == 0:
@@ -228,7 +413,6 @@ class E2HttpBox:
 
         logger.info(f"Getting expanded statuses for all cells")
         for controller in self.controllers:
-            controller.alarms = []
             for cell in controller.cells:
                 try:
                     resp = await self.http_interface.get_multi_expanded_status(
@@ -240,40 +424,15 @@ class E2HttpBox:
 
                     for each in result:
                         propval = each["prop"].split(":")
-                        mapping = CELLTYPE_MAPPINGS_TABLE[
-                            (CELLTYPE_MAPPINGS_TABLE.property_index == propval[-1])
-                        ]
-                        mapping_specific = mapping[
-                            mapping.celltype == str(cell.celltype)
-                        ]
-                        property_name = mapping_specific["property_name"].iloc[0]
+                        property_name = celltype_index().property_name(
+                            cell.celltype, propval[-1]
+                        )
                         point_data = {
-                            k: v
-                            for k, v in each.items()
-                            if k
-                            in (
-                                "alarm",
-                                "bypasstime",
-                                "dataType",
-                                "engUnits",
-                                "fail",
-                                "notice",
-                                "override",
-                                "ovtime",
-                                "ovtype",
-                                "value",
-                            )
+                            k: v for k, v in each.items() if k in POINT_FIELDS
                         }
                         point_data["name"] = property_name
                         cell.points[property_name] = Point(**point_data)
                 except Exception as e:
                     logger.error(f"{e}")
 
-            logging.info(f"Getting alarms for controller {controller.name}")
-            try:
-                resp = await self.http_interface.get_alarm_list(controller.name)
-                result = resp.get("result", {}).get("data", [])
-                for each in result:
-                    controller.alarms.append(Alarm(**each))
-            except Exception as e:
-                logger.error(f"{e}")
+            await self.poll_alarms(controller)
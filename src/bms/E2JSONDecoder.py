@@ -0,0 +1,52 @@
+import json
+import re
+
+# The E2 does not escape double quotes inside strings, e.g. 12" in a cell or
+# alarm text. A quote between two letters/digits can never end a string in
+# valid JSON, so it is dropped.
+STRAY_QUOTE = re.compile(r'(?<=[A-Za-z0-9])"(?=[A-Za-z0-9])')
+ENTRY_PROP = re.compile(r'"prop"\s*:\s*"((?:[^"]|' + STRAY_QUOTE.pattern + r')*)"')
+
+
+def repaired_entry(text: str, offset: int) -> str:
+    """The repaired "prop" of the response entry around offset, else the offset."""
+    start = text.rfind('"prop"', 0, offset)
+    if start != -1 and text.rfind("}", start, offset) == -1:
+        if match := ENTRY_PROP.match(text, start):
+            return STRAY_QUOTE.sub("", match.group(1))
+    return f"offset {offset}"
+
+
+def decode_response(response_text: str) -> tuple[dict | list, list[str]]:
+    """
+    Decode an E2 JSON-RPC response, repairing unescaped quotes if needed.
+
+    Well-formed responses go straight through json.loads. Otherwise the
+    stray quotes are dropped in one pass starting at the first decode error
+    (everything before it is valid JSON) and the text decoded again. Returns
+    the decoded response and the entries that were repaired, by "prop" where
+    the defect sits in a property entry. Raises json.JSONDecodeError when the
+    repaired text is still not JSON.
+    """
+    try:
+        return json.loads(response_text), []
+    except json.JSONDecodeError as e:
+        # The quote that ended the string early sits right before the error,
+        # after the character the repair has to look behind at
+        start = max(e.pos - 2, 0)
+
+    offsets: list[int] = []
+
+    def drop(match: re.Match) -> str:
+        offsets.append(match.start())
+        return ""
+
+    repaired = response_text[:start] + STRAY_QUOTE.sub(drop, response_text[start:])
+    ret = json.loads(repaired)
+
+    entries = []
+    for offset in offsets:
+        entry = repaired_entry(response_text, start + offset)
+        if entry not in entries:
+            entries.append(entry)
+    return ret, entries
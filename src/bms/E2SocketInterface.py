@@ -1,64 +1,64 @@
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
+import functools
 import logging
-import socks
-import socket
 import platform
 import json
 import core
 import asyncio
-from tenacity import Retrying, stop_after_attempt, wait_fixed
+from python_socks.async_.asyncio import Proxy
+from tenacity import AsyncRetrying, stop_after_attempt, wait_fixed
 import atexit
-import time
 
 logger = logging.getLogger(__name__)
 
 CPCR: str = f"43 50 43 52 00 01 19 00 00 00"
 CONTROLLER_SELECT: str = f"01 00 00 09 00 00 00"
+SOCKS_PROXY: str = "socks5://127.0.0.1:1080"
 
 with open(core.GENERAL_SETTINGS, "r") as f:
     general_settings: dict[str, int | str] = json.load(f)
 
 
-def socket_retry(method: Callable[..., bytes]) -> Callable[..., bytes | None]:
-    def wrapper(self, *args, **kwargs):
-        if not self.socket_open:
-            self.connect()
-
-        def attempt():
-            return method(self, *args, **kwargs)
-
-        # hook to log each failure
-        def log_retry(retry_state):
-            exc = retry_state.outcome.exception()
-            logging.warning(
-                f"Retry {retry_state.attempt_number} failed: {exc.__class__.__name__}: {exc}"
+def socket_retry(
+    method: Callable[..., Awaitable[bytes]],
+) -> Callable[..., Awaitable[bytes | None]]:
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        # One connection per request, as the E2 expects
+        async with self.lock:
+            if not self.socket_open:
+                await self.connect()
+
+            # hook to log each failure
+            async def log_retry(retry_state):
+                exc = retry_state.outcome.exception()
+                logging.warning(
+                    f"Retry {retry_state.attempt_number} failed: {exc.__class__.__name__}: {exc}"
+                )
+                logger.debug(f"Resetting the socket object just in case")
+                self.close()
+                await self.connect()
+
+            retryer = AsyncRetrying(
+                stop=stop_after_attempt(self.retries),
+                wait=wait_fixed(self.request_delay),
+                reraise=True,
+                before_sleep=log_retry,  # called before sleeping after a failed attempt
             )
-            logger.debug(f"Resetting the socket object just in case")
-            self.close()
-            self.connect()
-
-        retryer = Retrying(
-            stop=stop_after_attempt(self.retries),
-            wait=wait_fixed(self.request_delay),
-            reraise=True,
-            before_sleep=log_retry,  # called before sleeping after a failed attempt
-        )
 
-        try:
-            tcp_delay = int(general_settings.get("e2_tcp_delay_milliseconds", 300))
-        except:
-            tcp_delay = 300
-
-        tcp_delay = tcp_delay / 1000
-
-        result = retryer(attempt) if self.socket_open else None
-
-        self.close()
+            try:
+                result = (
+                    await retryer(method, self, *args, **kwargs)
+                    if self.socket_open
+                    else None
+                )
+            finally:
+                self.close()
 
-        if tcp_delay >= 0:
-            time.sleep(tcp_delay)
+            if self.tcp_delay >= 0:
+                await asyncio.sleep(self.tcp_delay)
 
-        return result
+            return result
 
     return wrapper
 
@@ -73,24 +73,34 @@ class E2SocketInterface:
         self.request_delay: int = general_settings.get(
             "http_request_delay", 3
         )  # Not using HTTP but good enough descriptor
+        try:
+            tcp_delay = int(general_settings.get("e2_tcp_delay_milliseconds", 300))
+        except:
+            tcp_delay = 300
+        self.tcp_delay: float = tcp_delay / 1000
+        # Reads end after this long without data, as with the old socket timeout
+        self.recv_timeout: float = 5
+        self.proxy_url: str | None = (
+            SOCKS_PROXY if platform.system() == "Linux" else None
+        )
         self.socket_open: bool = False
-        s = socks.socksocket()
-        if platform.system() == "Linux":
-            s.set_proxy(socks.SOCKS5, "127.0.0.1", 1080)
-        s.settimeout(5)
-        self.socket: socks.socksocket = s
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+        self.lock = asyncio.Lock()
         atexit.register(self.close)
 
-    def connect(self):
-        s = socks.socksocket()
-        if platform.system() == "Linux":
-            s.set_proxy(socks.SOCKS5, "127.0.0.1", 1080)
-        s.settimeout(5)
-
-        self.socket: socks.socksocket = s
-
+    async def connect(self):
         try:
-            self.socket.connect((self.ip, self.port))
+            if self.proxy_url:
+                sock = await Proxy.from_url(self.proxy_url).connect(
+                    self.ip, self.port, timeout=self.recv_timeout
+                )
+                connection = asyncio.open_connection(sock=sock)
+            else:
+                connection = asyncio.open_connection(self.ip, self.port)
+            self.reader, self.writer = await asyncio.wait_for(
+                connection, self.recv_timeout
+            )
             self.socket_open = True
             logger.info(f"Connected to E2 communication socket")
         except Exception as e:
@@ -99,24 +109,31 @@ class E2SocketInterface:
     def close(self):
         if self.socket_open:
             logger.info(f"Closing E2 communication socket")
-            self.socket.close()
+            self.writer.close()
         self.socket_open = False
 
-    def recv_all(self):
+    async def send(self, command: bytes):
+        self.writer.write(command)
+        await self.writer.drain()
+
+    async def recv(self, size: int) -> bytes:
+        return await asyncio.wait_for(self.reader.read(size), self.recv_timeout)
+
+    async def recv_all(self):
         data = b""
         while True:
             try:
-                chunk = self.socket.recv(self.recv_size)
+                chunk = await self.recv(self.recv_size)
                 if not chunk:
                     break
                 data += chunk
-            except socket.timeout:
+            except asyncio.TimeoutError:
                 break
             except Exception as e:
                 logger.error(f"Unhandled exception: {e}")
                 self.socket_open = False
                 raise e
-        time.sleep(self.request_delay)
+        await asyncio.sleep(self.request_delay)
         return data
 
     def hex_dump(self, data: bytes):
@@ -127,46 +144,46 @@ class E2SocketInterface:
             print(f"{i:08X}  {hex_part:<48}  {ascii_part}")
 
     @socket_retry
-    def get_controllers(self):
+    async def get_controllers(self):
         logger.debug(f"Sending GetControllerList to {self.ip}")
         command = bytes.fromhex(
             f"{CPCR} 1a 00 00 00 01 00 00 00 00 00 00 00 32 00 00 02"
         )
-        self.socket.sendall(command)
-        response: bytes = self.socket.recv(self.recv_size)
-        time.sleep(self.request_delay)
+        await self.send(command)
+        response: bytes = await self.recv(self.recv_size)
+        await asyncio.sleep(self.request_delay)
         if not response:
             self.socket_open = False
             raise ValueError("Invalid response received")
         return response
 
     @socket_retry
-    def get_alarms(self, controller_number: int):
+    async def get_alarms(self, controller_number: int):
         command = bytes.fromhex(
             f"{CPCR} 2e 00 00 00 15 00 00 00 {controller_number:02X} {CONTROLLER_SELECT} 01 00 00 00 37 00 00 00 08 00 00 00 01 00 00 00 02 00 00 00"
         )
-        self.socket.sendall(command)
-        response: bytes = self.recv_all()
+        await self.send(command)
+        response: bytes = await self.recv_all()
         if not response:
             self.socket_open = False
             raise ValueError("Invalid response received")
         return response
 
     @socket_retry
-    def get_cells_and_apps(self, controller_number: int):
+    async def get_cells_and_apps(self, controller_number: int):
         logger.debug(f"Sending get celltypes and cells to controller")
         command = bytes.fromhex(
             f"{CPCR} 2e 00 00 00 15 00 00 00 {controller_number:02X} {CONTROLLER_SELECT} 01 00 00 00 20 00 00 00 08 00 00 00 02 00 00 00 01 00 00 00"
         )
-        self.socket.sendall(command)
-        response: bytes = self.recv_all()
+        await self.send(command)
+        response: bytes = await self.recv_all()
         if not response:
             self.socket_open = False
             raise ValueError("Invalid response received")
         return response
 
     @socket_retry
-    def get_cell_status(
+    async def get_cell_status(
         self, controller_number: int, cell_tag: str, properties: list[int]
     ):
         logger.debug(f"Reading property {properties[0]} at address {cell_tag}")
@@ -183,8 +200,8 @@ class E2SocketInterface:
             f"{CPCR} 39 00 00 00 20 00 00 00 {controller_number:02X} {CONTROLLER_SELECT} "
             f"01 00 00 00 41 00 00 00 13 00 00 00 01 00 00 00 {len(properties):02X} 00 00 00 {query_string}"
         )
-        self.socket.sendall(command)
-        response: bytes = self.socket.recv(4096)
+        await self.send(command)
+        response: bytes = await self.recv(4096)
         if not response:
             raise ValueError("Invalid response received")
         return response
@@ -1,12 +1,18 @@
 import asyncio
+import json
 import logging
 from typing import Optional
 from rich.tree import Tree
 from rich import print as rprint
 from .E3HttpInterface import E3HttpInterface
+import core
+from core import AdaptiveChunker, ChunkAborted
 
 logger = logging.getLogger(__name__)
 
+with open(core.GENERAL_SETTINGS, "r") as f:
+    general_settings = json.load(f)
+
 
 class E3Box:
     def __init__(self, ip: str, name: str):
@@ -15,43 +21,36 @@ class E3Box:
         self.name = name
         self.groups: dict[str, Group] = {}
         self.unit_info: dict[str, str] = {}
+        # Rebuilt by build_index whenever the topology or unit info changes:
+        # "iid:pid" pointer of every logged point across all applications,
+        # the GetPointValues request entries for them, and per application
+        # the static part of its alarm record and point records
+        self.ptr_index: dict[str, Pid] = {}
+        self.request_points: list[dict[str, str]] = []
+        self.record_index: list[tuple[Application, dict, list[tuple[dict, Pid]]]] = []
+        # GetPointValues is sent in the URL query string, about 50 bytes per
+        # pointer, so this also bounds the request line the unit has to take
+        self.max_points_per_request: int = general_settings.get(
+            "e3_max_points_per_request", 40
+        )
+        self.chunker: AdaptiveChunker | None = None
+        self.discovery_slots = asyncio.Semaphore(
+            general_settings.get("e3_max_concurrent_requests", 4)
+        )
 
     def get_data(self) -> list[dict]:
         data: list[dict] = []
 
-        for g in self.groups.values():
-            for a in g.applications.values():
-                if a.alarms:
-                    alarm_record = {
-                        "@nodetype": "E3",
-                        "@node": g.name,
-                        "@mod": a.iid,
-                        "ip": self.unit_info.get("ip"),
-                        "appname": a.appname,
-                        "apptype": a.apptype,
-                        "category": a.category,
-                        "categorydef": a.categorydef,
-                        "alarms": a.alarms,
-                        "@point": "alarm_record",  # No specific PID associated
-                        "description": "Application-level alarms",
-                    }
-                    data.append(alarm_record)
+        for app, alarm_prefix, point_prefixes in self.record_index:
+            if app.alarms:
+                alarm_record = alarm_prefix.copy()
+                alarm_record["alarms"] = app.alarms
+                data.append(alarm_record)
 
-                for p in a.pids.values():
-                    pid_record = {
-                        "@nodetype": "E3",
-                        "@node": g.name,
-                        "@mod": a.iid,
-                        "@point": p.pid,
-                        "ip": self.unit_info.get("ip"),
-                        "appname": a.appname,
-                        "apptype": a.apptype,
-                        "category": a.category,
-                        "categorydef": a.categorydef,
-                        "val": p.present_value,
-                        "description": p.normal_name,
-                    }
-                    data.append(pid_record)
+            for prefix, pid in point_prefixes:
+                pid_record = prefix.copy()
+                pid_record["val"] = pid.present_value
+                data.append(pid_record)
 
         return data
 
@@ -72,6 +71,7 @@ class E3Box:
         if result:
             self.unit_info = result.get("result", {})
             self.unit_info["ip"] = self.ip
+            self.build_index()
             logger.info(f"Successfully updated {self.name}'s system information")
         else:
             logger.error(f"Could not update {self.name}'s system information")
@@ -117,31 +117,44 @@ class E3Box:
 
         logger.info(f"{self.name} is getting point values")
 
-        for group in self.groups.values():
-            for app in group.applications.values():
-                pid_map = {f"{app.iid}:{pid.pid}": pid for pid in app.pids.values()}
-
-                request_buffer = [{"ptr": ptr} for ptr in pid_map.keys()]
-                if len(request_buffer) != 0:
-                    response = await self.http_interface.get_point_values(
-                        request_buffer
-                    )
-                else:
-                    response = None
-
-                if response:
-                    points = response.get("result", {}).get("points", [])
-                    for point in points:
-                        try:
-                            ptr = point.get("ptr", "")
-                            value = point.get("val", None)
-                            pid = pid_map.get(ptr)
-                            if pid:
-                                pid.present_value = value
-                        except Exception as e:
-                            logger.error(f"Could not update point: {e}")
-
-        logger.info(f"{self.name} finished getting point values")
+        # Pointers of all applications are packed into as few requests as
+        # the unit accepts and scattered back through the pointer index.
+        # Requests the unit answers with an error are split and retried by
+        # the chunker; one it does not answer at all ends the run.
+        async def fetch(chunk):
+            response = await self.http_interface.get_point_values(chunk)
+            if response is None:
+                raise ChunkAborted()
+
+            result = response.get("result")
+            points = result.get("points") if isinstance(result, dict) else None
+            if "error" in response or points is None:
+                return None
+
+            for point in points:
+                try:
+                    pid = self.ptr_index.get(point.get("ptr", ""))
+                    if pid:
+                        pid.present_value = point.get("val", None)
+                except Exception as e:
+                    logger.error(f"Could not update point: {e}")
+            return len(chunk)
+
+        size = max(1, self.max_points_per_request)
+        if self.chunker is None or self.chunker.max_size != size:
+            self.chunker = AdaptiveChunker(
+                f"{self.name} GetPointValues",
+                initial_size=size,
+                min_size=min(10, size),
+                max_size=size,
+                target_seconds=self.http_interface.timeout / 2,
+            )
+        done = await self.chunker.run(self.request_points, fetch)
+
+        logger.info(
+            f"{self.name} finished getting point values, {sum(done)} of "
+            f"{len(self.request_points)} points read"
+        )
 
     async def get_logged_points(self) -> None:
         if self.groups == {}:
@@ -156,45 +169,53 @@ class E3Box:
             logger.info(f"{self.name} finished loading all used points")
         else:
             logger.error(f"{self.name} could not load all used points")
+            lgriids = []
 
-        logger.info(f"{self.name} is loading application descriptions")
-        pointerbuf: dict[str, dict[str, Pid]] = {}
-        descrbuf: dict[str, dict[str, dict[str, str]]] = {}
-        for lgriid in lgriids:
-            lgpoints = await self.http_interface.get_apps_for_log_group(lgriid)
-            lgpoints_pts = lgpoints.get("result", {}).get("loggedpoints", [])
+        async def apps_for_log_group(lgriid):
+            async with self.discovery_slots:
+                return await self.http_interface.get_apps_for_log_group(lgriid)
+
+        # All log groups first, then the descriptions of every unique iid
+        # in one batch, instead of one request chain per log group
+        ptrs: list[tuple[str, str]] = []
+        for lgpoints in await asyncio.gather(*map(apps_for_log_group, lgriids)):
+            lgpoints_pts = (lgpoints or {}).get("result", {}).get("loggedpoints", [])
             lgpoints_pts = (
                 [lgpoints_pts] if not isinstance(lgpoints_pts, list) else lgpoints_pts
             )
-
             for entry in lgpoints_pts:
                 try:
                     ptr_string = entry.get("ptr", None)
                     if ptr_string:
                         split = ptr_string.split(":")
-                        iid = split[0]
-                        pid = split[1]
-                        if iid not in pointerbuf:
-                            pointerbuf[iid] = {}
-                            app_description = (
-                                await self.http_interface.get_app_description(iid)
-                            )
-                            description_data = app_description.get("result", {}).get(
-                                "points", []
-                            )
-                            if not description_data:
-                                description_data = []
-                            if iid not in descrbuf:
-                                descrbuf[iid] = {}
-                            for entry in description_data:
-                                entry_pid = entry.get("pid", "")
-                                if entry_pid not in descrbuf[iid]:
-                                    descrbuf[iid][entry_pid] = entry
-
-                        pointerbuf[iid][pid] = Pid(pid, descrbuf[iid][pid])
+                        ptrs.append((split[0], split[1]))
                 except Exception as e:
                     logger.error(f"Unexpected error: {e}")
 
+        logger.info(f"{self.name} is loading application descriptions")
+        iids = list(dict.fromkeys(iid for iid, _ in ptrs))
+        descriptions = await self.http_interface.get_app_descriptions(
+            iids, self.discovery_slots
+        )
+
+        descrbuf: dict[str, dict[str, dict[str, str]]] = {}
+        for iid, app_description in zip(iids, descriptions):
+            description_data = (
+                (app_description or {}).get("result", {}).get("points", [])
+            )
+            descrbuf[iid] = {}
+            for entry in description_data or []:
+                entry_pid = entry.get("pid", "")
+                if entry_pid not in descrbuf[iid]:
+                    descrbuf[iid][entry_pid] = entry
+
+        pointerbuf: dict[str, dict[str, Pid]] = {}
+        for iid, pid in ptrs:
+            try:
+                pointerbuf.setdefault(iid, {})[pid] = Pid(pid, descrbuf[iid][pid])
+            except Exception as e:
+                logger.error(f"Unexpected error: {e}")
+
         for group in self.groups.values():
             for application in group.applications.values():
                 if application.iid in pointerbuf:
@@ -202,8 +223,49 @@ class E3Box:
                     for pid in pids.values():
                         pid.parent_application = application
                     application.pids = pids
+        self.build_index()
         logger.info(f"{self.name} finished loading application descriptions")
 
+    def build_index(self) -> None:
+        ip = self.unit_info.get("ip")
+        self.ptr_index = {}
+        self.record_index = []
+        for g in self.groups.values():
+            for a in g.applications.values():
+                app_meta = {
+                    "appname": a.appname,
+                    "apptype": a.apptype,
+                    "category": a.category,
+                    "categorydef": a.categorydef,
+                }
+                alarm_prefix = {
+                    "@nodetype": "E3",
+                    "@node": g.name,
+                    "@mod": a.iid,
+                    "ip": ip,
+                    **app_meta,
+                    "alarms": None,
+                    "@point": "alarm_record",  # No specific PID associated
+                    "description": "Application-level alarms",
+                }
+                point_prefixes = []
+                for p in a.pids.values():
+                    self.ptr_index[f"{a.iid}:{p.pid}"] = p
+                    prefix = {
+                        "@nodetype": "E3",
+                        "@node": g.name,
+                        "@mod": a.iid,
+                        "@point": p.pid,
+                        "ip": ip,
+                        **app_meta,
+                        "val": None,
+                        "description": p.normal_name,
+                    }
+                    point_prefixes.append((prefix, p))
+                self.record_index.append((a, alarm_prefix, point_prefixes))
+
+        self.request_points = [{"ptr": ptr} for ptr in self.ptr_index]
+
     async def get_inventory(self):
         if self.groups == {}:
             await self.get_groups()
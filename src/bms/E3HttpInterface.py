@@ -12,34 +12,42 @@ from aiohttp_socks import ProxyConnector
 import platform
 from typing import Optional
 import os
+import time
+from urllib.parse import quote
 
 logger = logging.getLogger(__name__)
 
 with open(core.GENERAL_SETTINGS, "r") as f:
     general_settings = json.load(f)
 
+# Discovery reads are shared between concurrent callers and reused for this long
+SINGLE_FLIGHT_TTL = general_settings.get("single_flight_ttl_seconds", 30)
 
-def verify_session(func):
-    async def wrapper(self, *args, **kwargs):
-        await self._close_session()
 
-        if self.session is None or not self.session_id:
-            await self._init_session()
+def session_closed(data) -> bool:
+    return (
+        isinstance(data, dict)
+        and data.get("error", {}).get("data", "")
+        == "Session has been closed, please refresh"
+    )
 
-        if self.permissions is None:
-            await self.login()
 
-        data = await func(self, *args, **kwargs)
+def verify_session(func):
+    async def wrapper(self, *args, **kwargs):
+        self.requests_in_flight += 1
+        try:
+            sid = await self.lease_session()
 
-        if (
-            data
-            and data.get("error", {}).get("data", "")
-            == "Session has been closed, please refresh"
-        ):
-            await self._close_session()
-            await self._init_session()
             data = await func(self, *args, **kwargs)
 
+            if session_closed(data):
+                logger.info(f"E3 session at {self.ip} was closed, logging in again")
+                await self.renew_session(sid)
+                data = await func(self, *args, **kwargs)
+        finally:
+            self.requests_in_flight -= 1
+            await self._close_retired_sessions()
+
         await asyncio.sleep(self.request_delay)
         return data
 
@@ -70,6 +78,32 @@ class E3HttpInterface:
         }
         self.permissions: Optional[dict[str, bool]] = None
 
+        # A logged in sid is reused until shortly before this lifetime runs
+        # out; 0 logs in again for every request
+        self.session_lifetime: float = general_settings.get(
+            "e3_session_lifetime_seconds", 300
+        )
+        self.session_expires: float = 0.0
+        self.session_lock = asyncio.Lock()
+        # Replaced sessions, with the time they were replaced, stay open while
+        # requests are in flight, for at most the time one request can take
+        self.retired_sessions: list[tuple[aiohttp.ClientSession, float]] = []
+        self.requests_in_flight: int = 0
+        self.retire_grace: float = self.retries * (self.timeout + self.request_delay)
+
+        # JSON-RPC batch arrays: None until the first batch shows whether the
+        # unit accepts them. Batches that keep failing in transport, e.g. a
+        # request line the unit will not take, are skipped for a while.
+        self.batch_supported: Optional[bool] = None
+        self.max_batch_calls: int = general_settings.get("jsonrpc_max_batch_calls", 20)
+        self.batch_breaker = core.CircuitBreaker(
+            f"E3 {ip} batch",
+            failure_threshold=2,
+            reset_seconds=general_settings.get("e3_batch_retry_seconds", 600),
+        )
+        # Calls travel URL encoded in the query string
+        self.max_query_bytes: int = general_settings.get("e3_max_query_bytes", 2048)
+
     async def _init_session(self):
         if self.session is None:
             connector = (
@@ -87,14 +121,66 @@ class E3HttpInterface:
             )
 
     async def _close_session(self):
+        self._retire_session()
+        retired, self.retired_sessions = self.retired_sessions, []
+        for session, _ in retired:
+            await session.close()
+
+    def _retire_session(self):
+        """
+        Swap out the current session without closing it, as concurrent
+        requests may still be using it. See _close_retired_sessions.
+        """
         if self.session:
-            await self.session.close()
+            self.retired_sessions.append((self.session, time.monotonic()))
             self.session = None
             self.permissions = None
             self.session_id = None
             self.id = 1
 
-    def _build_payload(self, method: str, params: Optional[dict] = None) -> dict:
+    async def _close_retired_sessions(self):
+        """Close replaced sessions once no request is in flight or past retire_grace."""
+        now = time.monotonic()
+        expired = [
+            entry
+            for entry in self.retired_sessions
+            if not self.requests_in_flight or now - entry[1] >= self.retire_grace
+        ]
+        if not expired:
+            return
+        self.retired_sessions = [e for e in self.retired_sessions if e not in expired]
+        for session, _ in expired:
+            await session.close()
+
+    async def lease_session(self) -> Optional[str]:
+        """
+        Make sure a logged in session is available and return its sid. The
+        session is replaced once 90% of session_lifetime has passed, so it is
+        refreshed before the unit expires it.
+        """
+        async with self.session_lock:
+            if self.session_lifetime <= 0 or time.monotonic() >= self.session_expires:
+                self._retire_session()
+
+            if self.session is None or not self.session_id:
+                await self._init_session()
+
+            if self.permissions is None:
+                await self.login()
+                if self.permissions is not None:
+                    self.session_expires = (
+                        time.monotonic() + self.session_lifetime * 0.9
+                    )
+            return self.session_id
+
+    async def renew_session(self, sid: Optional[str]):
+        """Log in again after the unit closed `sid`, unless already done."""
+        async with self.session_lock:
+            if self.session_id == sid:
+                self._retire_session()
+        await self.lease_session()
+
+    def _build_call(self, method: str, params: Optional[dict] = None) -> dict:
         payload = {
             "jsonrpc": "2.0",
             "method": method,
@@ -104,7 +190,10 @@ class E3HttpInterface:
         if params:
             payload["params"] = params
         self.id = self.id + 1 if self.id < 1000 else 1
-        return {"m": json.dumps(payload)}
+        return payload
+
+    def _build_payload(self, method: str, params: Optional[dict] = None) -> dict:
+        return {"m": json.dumps(self._build_call(method, params))}
 
     async def _send_get(
         self, method: str, params: Optional[dict] = None
@@ -116,8 +205,8 @@ class E3HttpInterface:
             wait=wait_fixed(self.request_delay),
             stop=stop_after_attempt(self.retries),
         )
-        async def try_send():
-            async with self.session.get(
+        async def try_send(session: aiohttp.ClientSession):
+            async with session.get(
                 self.endpoint, params=query, headers=self.http_headers
             ) as s:
                 try:
@@ -157,25 +246,29 @@ class E3HttpInterface:
 
                 return None
 
-        return await try_send()
+        return await try_send(self.session)
 
     async def _send_post(
         self, method: str, params: Optional[dict] = None
     ) -> Optional[dict]:
-        query = self._build_payload(method=method, params=params)
+        return await self._post_query(self._build_payload(method=method, params=params))
+
+    async def _post_query(self, query: dict):
         logger.debug(f"Sending {query} to {self.ip}")
 
         @retry(
             wait=wait_fixed(self.request_delay),
             stop=stop_after_attempt(self.retries),
         )
-        async def try_send():
-            async with self.session.post(
+        async def try_send(session: aiohttp.ClientSession):
+            start = time.perf_counter()
+            async with session.post(
                 self.endpoint, params=query, headers=self.http_headers
             ) as s:
                 try:
                     s.raise_for_status()
                     text = await s.text()
+                    core.report_response(time.perf_counter() - start, len(text))
 
                     if os.path.exists(core.PARENT_DIRECTORY / f"{self.ip}_BMS.err"):
                         logger.info(f"Removing {self.ip}_BMS.err")
@@ -210,7 +303,9 @@ class E3HttpInterface:
 
                 return None
 
-        return await try_send()
+        # Retries stay on the session the query was built for, the one the
+        # sid belongs to, even if another request replaces self.session
+        return await try_send(self.session)
 
     async def get_session_id(self):
         return await self._send_get("GetSessionID")
@@ -232,6 +327,107 @@ class E3HttpInterface:
 
         return resp
 
+    @verify_session
+    async def call(self, method: str, params: Optional[dict] = None):
+        return await self._send_post(method, {**(params or {}), "sid": self.session_id})
+
+    @verify_session
+    async def _call_batch_chunk(self, calls: list[tuple[str, Optional[dict]]]):
+        payloads = [
+            self._build_call(method, {**(params or {}), "sid": self.session_id})
+            for method, params in calls
+        ]
+        resp = await self._post_query({"m": json.dumps(payloads)})
+        if not resp:
+            return None
+
+        if isinstance(resp, list):
+            by_id = {r.get("id"): r for r in resp if isinstance(r, dict)}
+            results = [by_id.get(p["id"]) for p in payloads]
+            # Let verify_session log in again and resend the whole chunk
+            closed = next((r for r in results if session_closed(r)), None)
+            return closed or {"batch": results}
+
+        # A single response to an array: the unit does not take batches
+        return resp if session_closed(resp) else {"batch": None}
+
+    def _batch_chunks(self, calls: list[tuple[str, Optional[dict]]]):
+        """
+        Split calls into batches of up to max_batch_calls whose URL encoded
+        query stays within max_query_bytes. A call too big on its own is a
+        batch of one.
+        """
+        sid = self.session_id or "0" * 32
+        chunk: list[tuple[str, Optional[dict]]] = []
+        size = len("m=[]")
+        for method, params in calls:
+            call = {
+                "jsonrpc": "2.0",
+                "method": method,
+                "id": "1000",
+                "params": {**(params or {}), "sid": sid},
+            }
+            call_size = len(quote(json.dumps(call) + ", ", safe=""))
+            if chunk and (
+                len(chunk) >= max(1, self.max_batch_calls)
+                or size + call_size > self.max_query_bytes
+            ):
+                yield chunk
+                chunk, size = [], len("m=[]")
+            chunk.append((method, params))
+            size += call_size
+        if chunk:
+            yield chunk
+
+    async def call_batch(
+        self,
+        calls: list[tuple[str, Optional[dict]]],
+        slots: Optional[asyncio.Semaphore] = None,
+    ) -> list[Optional[dict]]:
+        """
+        Run calls of (method, params) and return their responses in order.
+        The sid is added to every call. Calls are sent as JSON-RPC batch
+        arrays (see _batch_chunks) when the unit accepts them, otherwise, or
+        when a batch fails, one request per call, as many at a time as slots
+        allows (one without).
+        """
+        slots = slots or asyncio.Semaphore(1)
+
+        async def single(method: str, params: Optional[dict]):
+            async with slots:
+                return await self.call(method, params)
+
+        results: list[Optional[dict]] = []
+        for chunk in self._batch_chunks(calls):
+            if self.batch_supported is not False and self.batch_breaker.allow():
+                resp = await self._call_batch_chunk(chunk)
+                if resp is not None and resp.get("batch") is not None:
+                    self.batch_supported = True
+                    self.batch_breaker.record_success()
+                    results.extend(resp["batch"])
+                    continue
+                if resp is not None and "batch" in resp:
+                    # A single well-formed response to the array: the unit
+                    # does not take batches
+                    logger.info(f"E3 at {self.ip} does not accept batch requests")
+                    self.batch_supported = False
+                else:
+                    # Transport failures and closed sessions leave it to the
+                    # next probe, until the breaker opens. The chunk itself
+                    # is still sent as single calls.
+                    self.batch_breaker.record_failure()
+
+            singles = await asyncio.gather(*(single(m, p) for m, p in chunk))
+            results.extend(singles)
+        return results
+
+    async def get_app_descriptions(
+        self, iids: list[str], slots: Optional[asyncio.Semaphore] = None
+    ) -> list[Optional[dict]]:
+        return await self.call_batch(
+            [("GetAppDescription", {"iid": iid}) for iid in iids], slots
+        )
+
     @verify_session
     async def get_network_summary(self):
         return await self._send_post("GetNetworkSummary", {"sid": self.session_id})
@@ -248,6 +444,7 @@ class E3HttpInterface:
     async def get_setup_wizard_status(self):
         return await self._send_post("GetSetupWizardStatus", {"sid": self.session_id})
 
+    @core.single_flight(SINGLE_FLIGHT_TTL)
     @verify_session
     async def get_system_inventory(self):
         return await self._send_post("GetSystemInventory", {"sid": self.session_id})
@@ -256,6 +453,7 @@ class E3HttpInterface:
     async def get_alarms(self):
         return await self._send_post("GetAlarms", {"sid": self.session_id})
 
+    @core.single_flight(SINGLE_FLIGHT_TTL)
     @verify_session
     async def get_groups(self):
         return await self._send_post(
@@ -268,6 +466,7 @@ class E3HttpInterface:
             "GetAppDescription", {"iid": iid, "sid": self.session_id}
         )
 
+    @core.single_flight(SINGLE_FLIGHT_TTL)
     @verify_session
     async def get_system_information(self):
         return await self._send_post("GetSystemInformation", {"sid": self.session_id})
@@ -278,6 +477,7 @@ class E3HttpInterface:
             "GetAppCommands", {"iid": iid, "sid": self.session_id}
         )
 
+    @core.single_flight(SINGLE_FLIGHT_TTL)
     @verify_session
     async def get_default_log_group(self):
         return await self._send_post("GetDefaultLogGroup", {"sid": self.session_id})
@@ -294,12 +494,14 @@ class E3HttpInterface:
             "GetDashboardSummaryProps", {"apptype": apptype, "sid": self.session_id}
         )
 
+    @core.single_flight(SINGLE_FLIGHT_TTL)
     @verify_session
     async def get_apps_for_log_group(self, lgiid: str):
         return await self._send_post(
             "GetAppsForLogGroup", {"lgiid": lgiid, "sid": self.session_id}
         )
 
+    @core.single_flight(SINGLE_FLIGHT_TTL)
     @verify_session
     async def get_points_for_log_group(self, lgiid: str):
         return await self._send_post(
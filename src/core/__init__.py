@@ -1,4 +1,7 @@
 from .aobject import aobject
+from .breaker import CircuitBreaker
+from .chunker import AdaptiveChunker, ChunkAborted, report_response
+from .singleflight import single_flight
 from logging_utils import setup_logging
 from .files import *
 
@@ -0,0 +1,98 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker for one BMS panel.
+
+    After failure_threshold consecutive failed requests the breaker opens and
+    requests fail fast without touching the network. Once reset_seconds have
+    passed a single probe request is let through (half-open): success closes
+    the breaker, failure opens it for another reset_seconds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_seconds=300):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state: str = self.CLOSED
+        self.failures: int = 0
+        self.opened_at: float = 0.0
+        # Start of the current outage, kept across failed probes
+        self.open_since: float | None = None
+        self.times_opened: int = 0
+        self.rejected: int = 0
+        self.probe_in_flight: bool = False
+        self.probe_started: float = 0.0
+
+    def __repr__(self):
+        return f"CircuitBreaker(name={self.name}, state={self.state})"
+
+    def allow(self) -> bool:
+        """Whether a request may go out now. Claims the probe when half-open."""
+        if self.state == self.CLOSED:
+            return True
+
+        if (
+            self.state == self.OPEN
+            and time.monotonic() - self.opened_at >= self.reset_seconds
+        ):
+            self.state = self.HALF_OPEN
+            logger.info(f"{self.name} breaker half-open, probing")
+
+        # A probe that never reported back (e.g. cancelled) is given up on
+        # after another reset_seconds
+        if self.state == self.HALF_OPEN and (
+            not self.probe_in_flight
+            or time.monotonic() - self.probe_started >= self.reset_seconds
+        ):
+            self.probe_in_flight = True
+            self.probe_started = time.monotonic()
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info(f"{self.name} breaker closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probe_in_flight = False
+        self.open_since = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(
+                    f"{self.name} breaker open after {self.failures} failures, "
+                    f"next probe in {self.reset_seconds}s"
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            if self.open_since is None:
+                self.open_since = self.opened_at
+        self.probe_in_flight = False
+
+    def open_seconds(self) -> float:
+        """How long the breaker has not been closed since it first opened."""
+        if self.open_since is None:
+            return 0.0
+        return time.monotonic() - self.open_since
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+from contextvars import ContextVar
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseStats:
+    __slots__ = ("elapsed", "size")
+
+    def __init__(self) -> None:
+        self.elapsed: float | None = None
+        self.size: int | None = None
+
+
+# Set by AdaptiveChunker around every chunk request so the interface that
+# actually talks to the network can report how long the response took and how
+# big it was, without any post-request delays or lock waits mixed in.
+response_stats: ContextVar[ResponseStats | None] = ContextVar(
+    "response_stats", default=None
+)
+
+
+def report_response(elapsed: float, size: int) -> None:
+    stats = response_stats.get()
+    if stats is not None:
+        stats.elapsed = elapsed
+        stats.size = size
+
+
+class ChunkAborted(Exception):
+    """Raised by a chunk fetch when no response came back, to end the run."""
+
+
+class AdaptiveChunker:
+    """
+    Split bulk requests into chunks sized from observed responses.
+
+    The chunk size follows the per-item response time (aiming for
+    target_seconds per request) and the per-item response size (aiming to stay
+    below max_bytes). Chunks the controller rejects are halved and retried on
+    their own. A chunk that gets no response at all ends the run, as smaller
+    requests would not fare better against a dead or timing out controller.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_size: int,
+        min_size: int = 1,
+        max_size: int | None = None,
+        target_seconds: float = 1.5,
+        max_bytes: int = 512 * 1024,
+        max_consecutive_failures: int = 3,
+    ) -> None:
+        self.name = name
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size or initial_size * 4)
+        self.size = min(max(initial_size, self.min_size), self.max_size)
+        # Upper bound lowered by failures and slowly relaxed by successes, so
+        # a size that timed out is not immediately tried again
+        self.ceiling = self.max_size
+        self.target_seconds = target_seconds
+        self.max_bytes = max_bytes
+        self.max_consecutive_failures = max_consecutive_failures
+        self.seconds_per_item: float | None = None
+        self.bytes_per_item: float | None = None
+
+    def __repr__(self):
+        return f"AdaptiveChunker(name={self.name}, size={self.size})"
+
+    @staticmethod
+    def _smooth(previous: float | None, sample: float) -> float:
+        return sample if previous is None else previous * 0.5 + sample * 0.5
+
+    def record_success(self, items: int, elapsed: float, size: int | None) -> None:
+        items = max(items, 1)
+        self.seconds_per_item = self._smooth(self.seconds_per_item, elapsed / items)
+        if size is not None:
+            self.bytes_per_item = self._smooth(self.bytes_per_item, size / items)
+
+        self.ceiling = min(self.max_size, int(self.ceiling * 1.1) + 1)
+
+        ideal = self.ceiling
+        if self.seconds_per_item > 0:
+            ideal = min(ideal, int(self.target_seconds / self.seconds_per_item))
+        if self.bytes_per_item:
+            ideal = min(ideal, int(self.max_bytes / self.bytes_per_item))
+        ideal = max(self.min_size, ideal)
+
+        # Only move on a clear difference so chunk boundaries stay stable
+        # between cycles instead of jittering with every response.
+        if abs(ideal - self.size) > self.size * 0.25:
+            logger.debug(f"{self.name} chunk size {self.size} -> {ideal}")
+            self.size = ideal
+
+    def record_failure(self, items: int) -> None:
+        self.ceiling = max(self.min_size, min(self.ceiling, items) // 2)
+        self.size = min(self.size, self.ceiling)
+        logger.debug(f"{self.name} chunk failed, chunk size now {self.size}")
+
+    async def run(
+        self,
+        items: Sequence,
+        fetch: Callable[[Sequence], Awaitable[Any]],
+        concurrency: int = 1,
+    ) -> list:
+        """
+        Request every item through fetch(chunk), with up to `concurrency`
+        chunks in flight. fetch returns None for a chunk the controller
+        rejected, so it is split, and raises ChunkAborted (or any other
+        exception) when no response came back, which stops the run. Returns
+        the results of every successful chunk.
+        """
+        results: list = []
+        pending: deque[Sequence] = deque()
+        offset = 0
+        consecutive_failures = 0
+        aborted = False
+        # Splits are worked depth-first, so a dead controller fails at most
+        # once per halving on top of max_consecutive_failures before we stop.
+        failure_limit = (
+            self.max_consecutive_failures
+            + (self.size // self.min_size).bit_length()
+            - 1
+        )
+
+        async def worker():
+            nonlocal offset, consecutive_failures, aborted
+            while consecutive_failures < failure_limit and not aborted:
+                if pending:
+                    chunk = pending.popleft()
+                elif offset < len(items):
+                    chunk = items[offset : offset + self.size]
+                    offset += len(chunk)
+                else:
+                    return
+
+                stats = ResponseStats()
+                token = response_stats.set(stats)
+                start = time.perf_counter()
+                try:
+                    result = await fetch(chunk)
+                except Exception as e:
+                    if not isinstance(e, ChunkAborted):
+                        logger.warning(f"{self.name} chunk request raised: {e}")
+                    aborted = True
+                    return
+                finally:
+                    response_stats.reset(token)
+                elapsed = stats.elapsed
+                if elapsed is None:
+                    elapsed = time.perf_counter() - start
+
+                if result is not None:
+                    consecutive_failures = 0
+                    self.record_success(len(chunk), elapsed, stats.size)
+                    results.append(result)
+                    continue
+
+                consecutive_failures += 1
+                self.record_failure(len(chunk))
+                if len(chunk) > self.min_size:
+                    middle = len(chunk) // 2
+                    pending.extendleft([chunk[middle:], chunk[:middle]])
+                else:
+                    logger.warning(f"{self.name} dropping {len(chunk)} failed items")
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+        if aborted:
+            logger.warning(f"{self.name} stopped, a chunk got no response")
+        elif consecutive_failures >= failure_limit:
+            logger.warning(
+                f"{self.name} stopped after {consecutive_failures} failed chunks in a row"
+            )
+        return results
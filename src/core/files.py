@@ -85,6 +85,24 @@ default_general = {
     "e2_tcp_delay_milliseconds": 1,
     "lock_reset_seconds": 43200,
     "e2_buffer_length": 75,
+    "danfoss_chunk_size": 100,
+    "danfoss_max_concurrent_requests": 2,
+    "danfoss_cs_rescan_minutes": 60,
+    "single_flight_ttl_seconds": 30,
+    "breaker_failure_threshold": 3,
+    "breaker_reset_seconds": 300,
+    "danfoss_bulk_snapshot": False,
+    "e3_session_lifetime_seconds": 300,
+    "e3_max_points_per_request": 40,
+    "jsonrpc_max_batch_calls": 20,
+    "e3_max_query_bytes": 2048,
+    "e3_batch_retry_seconds": 600,
+    "e3_max_concurrent_requests": 4,
+    "e2_max_concurrent_requests": 2,
+    "e2_persistent_session": False,
+    "e2_session_idle_seconds": 60,
+    "e2_persistent_retry_seconds": 600,
+    "e2_property_tiers": {},
 }
 
 default_ip = {
@@ -0,0 +1,72 @@
+import asyncio
+import copy
+import functools
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def failed_response(result: Any) -> bool:
+    """Empty responses and the error shapes returned by the BMS interfaces."""
+    if not result:
+        return True
+    return isinstance(result, dict) and ("@error" in result or "error" in result)
+
+
+def single_flight(
+    ttl: float = 0.0, failed: Callable[[Any], bool] = failed_response
+) -> Callable:
+    """
+    Deduplicate calls of an async interface method with identical arguments.
+
+    Concurrent calls share the one request already in flight, and a successful
+    result is reused for `ttl` seconds. Failed results (as judged by `failed`)
+    are handed to the callers waiting on them but never kept. State is kept
+    per interface instance, and expired results are dropped whenever a new
+    one is stored.
+
+    Callers may mutate what they get back: only the caller that started the
+    request receives the result itself, everyone else gets a deep copy.
+    """
+
+    def decorator(func):
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            key = (name, repr(args), repr(sorted(kwargs.items())))
+            flights: dict = self.__dict__.setdefault("_single_flight", {})
+            memo: dict = self.__dict__.setdefault("_single_flight_memo", {})
+
+            if (hit := memo.get(key)) is not None:
+                expires, result = hit
+                if time.monotonic() < expires:
+                    logger.debug(f"{name}{args} served from memo")
+                    return copy.deepcopy(result)
+                del memo[key]
+
+            if (flight := flights.get(key)) is not None:
+                logger.debug(f"{name}{args} joined in-flight request")
+                return copy.deepcopy(await asyncio.shield(flight))
+
+            flight = asyncio.ensure_future(func(self, *args, **kwargs))
+            flights[key] = flight
+            try:
+                result = await asyncio.shield(flight)
+            finally:
+                if flights.get(key) is flight:
+                    del flights[key]
+
+            if ttl > 0 and not failed(result):
+                now = time.monotonic()
+                for stale in [k for k, (expires, _) in memo.items() if expires <= now]:
+                    del memo[stale]
+                memo[key] = (now + ttl, copy.deepcopy(result))
+            return result
+
+        return wrapper
+
+    return decorator
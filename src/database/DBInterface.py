@@ -3,7 +3,7 @@ import asyncio
 import core.files
 import logging
 import pandas as pd
-from collections.abc import Mapping, Sequence
+from collections.abc import Iterable, Mapping, Sequence
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +41,84 @@ class DBInterface:
 
         return grouped_payloads
 
+    async def fetch_cov_rows(
+        self, rows: Iterable[tuple], full_frame: bool = False
+    ) -> list[dict]:
+        """
+        fetch_cov_data for boxes that emit flat
+        (nodetype, node, mod, point, ip, key, value) rows, skipping the
+        DataFrame round trip.
+        """
+        changed = await self.get_row_changes(rows, full_frame=full_frame)
+        await self.store_row_changes(changed, full_frame=full_frame)
+        return self.group_rows(changed)
+
+    async def get_row_changes(
+        self,
+        rows: Iterable[tuple],
+        table_name: str = "data_table",
+        full_frame: bool = False,
+    ) -> list[tuple]:
+        """
+        The rows that are new or differ from the table, without writing them.
+        A full frame returns every row. Pass the result to store_row_changes
+        once it was sent, so unsent changes are found again next time.
+        """
+        if not self.active:
+            await self.initialize()
+        await self.ensure_table(table_name)
+
+        known = {}
+        if not full_frame:
+            db_rows = await self.conn.execute_fetchall(f"SELECT * FROM {table_name}")
+            known = {tuple(r[:6]): r[6] for r in db_rows}
+
+        # Values are stored as text, so they are compared as text: a bool
+        # would never equal what SQLite made of it
+        changed = []
+        for row in rows:
+            value = "novalue" if row[6] is None else row[6]
+            old = known.get(row[:6])
+            if old is None or str(value) != old:
+                changed.append((*row[:6], value))
+        return changed
+
+    async def store_row_changes(
+        self,
+        changed: list[tuple],
+        table_name: str = "data_table",
+        full_frame: bool = False,
+    ):
+        """Upsert rows from get_row_changes, replacing the table for a full frame."""
+        if full_frame:
+            await self.conn.execute(f"DELETE FROM {table_name}")
+        async with self.conn.executemany(
+            f"""
+            INSERT INTO {table_name} (nodetype, node, mod, point, ip, key, value)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(nodetype, node, mod, point, ip, key)
+            DO UPDATE SET value = excluded.value
+            """,
+            [(*row[:6], str(row[6])) for row in changed],
+        ):
+            pass
+        await self.conn.commit()
+
+    def group_rows(self, changed: list[tuple]) -> list[dict]:
+        """Device payloads of (nodetype, node, mod, point, ip, key, value) rows."""
+        grouped: dict[str, list] = {}
+        for nodetype, node, mod, point, ip, key, value in changed:
+            grouped.setdefault(ip, []).append([nodetype, node, mod, point, key, value])
+
+        return [
+            {
+                "device": ip,
+                "schema": ["nodetype", "node", "mod", "point", "key", "value"],
+                "records": grouped[ip],
+            }
+            for ip in sorted(grouped)
+        ]
+
     async def initialize(self):
         self.conn = await aiosqlite.connect(self.db_path)
         await self.conn.execute("PRAGMA foreign_keys = ON")
@@ -166,6 +244,14 @@ class DBInterface:
         # Return only changed/new rows
         return changed[["nodetype", "node", "mod", "point", "ip", "key", "value"]]
 
+    async def upsert_rows_and_get_changes(
+        self, rows: Iterable[tuple], table_name: str
+    ) -> list[tuple]:
+        """upsert_and_get_changes for rows already in the table's column order."""
+        changed = await self.get_row_changes(rows, table_name)
+        await self.store_row_changes(changed, table_name)
+        return changed
+
     def raw_data_to_df(self, data_list: list[dict]):
         def denormalize_dict(ret: dict) -> dict | None:
             def walk(obj, prefix=""):
@@ -208,8 +208,8 @@ class Store:
 
         panel = self.emerson2_panels[-1]  # Only one controller is needed
         if not panel.initialized:
-            panel.initialize()
-        panel.get_cell_statuses()
+            await panel.initialize()
+        await panel.get_cell_statuses()
         data = panel.get_data()
         iot_data = await self.db_interface.fetch_cov_data(data, full_frame=full_frame)
         await self.edge_device.send_message(iot_data)
@@ -222,9 +222,14 @@ class Store:
         if not panel.initialized:
             await panel.initialize()
         await panel.poll_all_buffered()
-        data = panel.get_data()
-        iot_data = await self.db_interface.fetch_cov_data(data, full_frame=full_frame)
-        await self.edge_device.send_message(iot_data)
+        rows = panel.get_rows(full_frame=full_frame)
+        # Changes are only stored once sent, so a failed send publishes them
+        # again with the next frame
+        changed = await self.db_interface.get_row_changes(rows, full_frame=full_frame)
+        iot_data = self.db_interface.group_rows(changed)
+        if await self.edge_device.send_message(iot_data):
+            await self.db_interface.store_row_changes(changed, full_frame=full_frame)
+            panel.clear_alarm_changes()
 
     async def gather_and_send_danfoss(self, full_frame=False):
         """Gather and send data from Danfoss panels."""
@@ -247,9 +252,7 @@ class Store:
         iot_data = await self.db_interface.fetch_cov_data(data, full_frame=full_frame)
         await self.edge_device.send_message(iot_data)
 
-        if all(
-            [f.xml_interface.failed_requests > REQ_WAT for f in self.danfoss_panels]
-        ):
+        if all([f.xml_interface.connection_failed() for f in self.danfoss_panels]):
             logger.critical(
                 f"Unrecoverable danfoss bms connection error. Shutting down"
             )
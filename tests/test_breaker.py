@@ -0,0 +1,61 @@
+import srcpath
+from core import CircuitBreaker
+
+
+def expire(breaker: CircuitBreaker):
+    breaker.opened_at -= breaker.reset_seconds
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=60)
+    breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_half_open_allows_single_probe():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    expire(breaker)
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=60)
+    for _ in range(3):
+        breaker.record_failure()
+    expire(breaker)
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 2
+    assert not breaker.allow()
+
+
+def test_open_seconds_span_failed_probes():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=60)
+    assert breaker.open_seconds() == 0.0
+
+    breaker.record_failure()
+    breaker.open_since -= 100
+    expire(breaker)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.open_seconds() >= 100
+
+    expire(breaker)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.open_seconds() == 0.0
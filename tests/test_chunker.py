@@ -0,0 +1,83 @@
+import srcpath
+import asyncio
+import pytest
+from core.chunker import AdaptiveChunker, ChunkAborted, report_response
+
+
+@pytest.mark.asyncio
+async def test_chunks_cover_every_item_once():
+    chunker = AdaptiveChunker("test", initial_size=7)
+    seen = []
+
+    async def fetch(chunk):
+        seen.extend(chunk)
+        return list(chunk)
+
+    results = await chunker.run(list(range(50)), fetch, concurrency=3)
+    assert sorted(seen) == list(range(50))
+    assert sorted(x for chunk in results for x in chunk) == list(range(50))
+
+
+@pytest.mark.asyncio
+async def test_failed_chunks_are_split_and_retried():
+    chunker = AdaptiveChunker("test", initial_size=40, min_size=5)
+    requested = []
+
+    async def fetch(chunk):
+        requested.append(len(chunk))
+        return None if len(chunk) > 10 else list(chunk)
+
+    results = await chunker.run(list(range(40)), fetch)
+    assert sorted(x for chunk in results for x in chunk) == list(range(40))
+    assert requested[:4] == [40, 20, 10, 10]
+    assert chunker.size < 20
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_consecutive_failures():
+    chunker = AdaptiveChunker(
+        "test", initial_size=10, min_size=10, max_consecutive_failures=3
+    )
+    calls = 0
+
+    async def fetch(chunk):
+        nonlocal calls
+        calls += 1
+        return None
+
+    assert await chunker.run(list(range(100)), fetch) == []
+    assert calls == 3
+
+
+@pytest.mark.asyncio
+async def test_run_stops_on_first_chunk_without_response():
+    chunker = AdaptiveChunker("test", initial_size=40, min_size=5)
+    calls = 0
+
+    async def fetch(chunk):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ChunkAborted()
+
+    assert await chunker.run(list(range(200)), fetch, concurrency=2) == []
+    assert calls == 2
+    assert chunker.size == 40
+
+
+@pytest.mark.asyncio
+async def test_chunk_size_follows_reported_response_time():
+    chunker = AdaptiveChunker(
+        "test", initial_size=10, max_size=1000, target_seconds=1.0
+    )
+
+    async def fetch(chunk):
+        report_response(elapsed=len(chunk) * 0.01, size=len(chunk) * 100)
+        return list(chunk)
+
+    await chunker.run(list(range(30)), fetch)
+    assert chunker.size == 100
+
+    chunker.max_bytes = 2000
+    await chunker.run(list(range(30)), fetch)
+    assert chunker.size == 20
@@ -0,0 +1,461 @@
+import srcpath
+import pytest
+import xmltodict as xtd
+from bms.DanfossBox import DanfossBox
+from bms.DanfossXMLInterface import DanfossXMLInterface
+from bms.DanfossXMLDecoder import decode_point_response
+
+
+class FakeXMLInterface:
+    def __init__(self, responses: dict):
+        self.ip = "10.0.0.1"
+        self.timeout = 3
+        self.max_concurrent_requests = 2
+        self.responses = responses
+        self.calls: list[tuple] = []
+
+    def __getattr__(self, action):
+        async def command(*args, **kwargs):
+            self.calls.append((action, *args))
+            response = self.responses.get(action, {})
+            return response(*args) if callable(response) else response
+
+        return command
+
+    def count(self, action: str) -> int:
+        return len([c for c in self.calls if c[0] == action])
+
+
+def make_box(responses: dict) -> DanfossBox:
+    box = DanfossBox("10.0.0.1", "test_panel")
+    box.xml_interface = FakeXMLInterface(responses)
+    return box
+
+
+def alarm_detail(ref):
+    return {"@current": str(ref), "nodetype": "2", "node": "1", "mod": "0"}
+
+
+@pytest.mark.asyncio
+async def test_alarm_detail_only_fetched_for_new_refs():
+    summary = {"active": {"ref": ["1", "2"]}}
+    box = make_box({"alarm_summary": summary, "alarm_detail": alarm_detail})
+
+    await box.update_alarms()
+    await box.update_alarms()
+
+    assert box.xml_interface.count("alarm_detail") == 2
+    assert box.get_point("alarm_1", "alarm_1", "alarm_1", "alarm_1") is not None
+
+
+@pytest.mark.asyncio
+async def test_alarm_detail_refetched_on_state_change():
+    summary = {"active": {"ref": "1"}}
+    box = make_box({"alarm_summary": summary, "alarm_detail": alarm_detail})
+    await box.update_alarms()
+
+    summary.pop("active")
+    summary["acked"] = {"ref": "1"}
+    await box.update_alarms()
+
+    assert box.xml_interface.count("alarm_detail") == 2
+
+
+@pytest.mark.asyncio
+async def test_alarm_detail_cache_evicted_on_clear():
+    summary = {"active": {"ref": "1"}}
+    box = make_box({"alarm_summary": summary, "alarm_detail": alarm_detail})
+    await box.update_alarms()
+
+    summary["cleared"] = {"ref": "1"}
+    summary.pop("active")
+    await box.update_alarms()
+    assert "1" not in box.alarm_detail_cache
+
+    point = box.get_point("alarm_1", "alarm_1", "alarm_1", "alarm_1")
+    assert point.meta["alarm_detail"] == {}
+
+
+@pytest.mark.asyncio
+async def test_alarm_detail_cache_evicted_when_ref_disappears():
+    summary = {"active": {"ref": ["1", "2"]}}
+    box = make_box({"alarm_summary": summary, "alarm_detail": alarm_detail})
+    await box.update_alarms()
+
+    summary["active"] = {"ref": "2"}
+    await box.update_alarms()
+    assert box.alarm_detail_cache == {"2": "active"}
+
+    box.xml_interface.responses["alarm_summary"] = {"@error": "Connection Error"}
+    await box.update_alarms()
+    assert box.alarm_detail_cache == {"2": "active"}
+
+
+@pytest.mark.asyncio
+async def test_failed_alarm_detail_is_retried():
+    summary = {"active": {"ref": "1"}}
+    box = make_box(
+        {
+            "alarm_summary": summary,
+            "alarm_detail": {"@action": "alarm_detail", "@error": "Connection Error"},
+        }
+    )
+    await box.update_alarms()
+    await box.update_alarms()
+
+    assert box.xml_interface.count("alarm_detail") == 2
+
+
+def test_decoder_matches_xmltodict_records():
+    text = (
+        '<resp action="read_sensor" total="2">'
+        '<sensor node="1" mod="0" point="1" units="F">12.5</sensor>'
+        '<sensor node="1" mod="0" point="2"><alarm id="3"/><alarm id="4"/></sensor>'
+        "</resp>"
+    )
+    expected = xtd.parse(text)["resp"]["sensor"]
+    for record in expected:
+        record["@nodetype"] = "2"
+
+    resp = decode_point_response("read_sensor", text)
+    assert resp["@total"] == "2"
+    assert resp["sensor"] == expected
+
+
+def test_decoder_splits_monitor_records():
+    text = (
+        '<resp action="read_monitor_detail">'
+        '<monitor nodetype="2" node="1" mod="0" point="1" cutout="-25.0"/>'
+        "</resp>"
+    )
+    resp = decode_point_response("read_monitor_detail", text)
+    assert resp["monitor"] == [
+        {
+            "@nodetype": "2",
+            "@node": "1",
+            "@mod": "0",
+            "@point": "1",
+            "monitor": {"@cutout": "-25.0"},
+        }
+    ]
+    assert decode_point_response("read_input", '<resp action="read_input"/>') == {
+        "@action": "read_input",
+        "input": [],
+    }
+
+
+@pytest.mark.asyncio
+async def test_point_reads_are_chunked():
+    def read_sensor(addresses):
+        return {
+            "sensor": [
+                {**{f"@{k}": str(v) for k, v in a.items()}, "@nodetype": "2"}
+                for a in addresses
+            ]
+        }
+
+    box = make_box({"read_sensor": read_sensor})
+    box.chunk_size = 10
+    for point in range(25):
+        await box.add_point(
+            {"@nodetype": "2", "@node": "1", "@mod": "0", "@point": str(point)}
+        )
+
+    await box.update_nodetype_2()
+    reads = [c for c in box.xml_interface.calls if c[0] == "read_sensor"]
+    assert len(reads[0][1]) == 10
+    assert sum(len(c[1]) for c in reads) == 25
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", ["Connection Error", "Circuit open"])
+async def test_point_reads_stop_when_panel_does_not_answer(error):
+    box = make_box({"read_sensor": {"@action": "read_sensor", "@error": error}})
+    box.chunk_size = 40
+    for point in range(100):
+        await box.add_point(
+            {"@nodetype": "2", "@node": "1", "@mod": "0", "@point": str(point)}
+        )
+
+    await box.update_nodetype_2()
+    assert box.xml_interface.count("read_sensor") == 1
+    assert box.chunkers["2"].size == 40
+    assert box.chunkers["2"].ceiling == box.chunkers["2"].max_size
+
+
+def leak_site(zones: dict):
+    def read_cs_device_value(device_num, zone_num):
+        name = zones.get((device_num, zone_num), "")
+        known_device = any(device == device_num for device, _ in zones)
+        status = "Normal" if known_device else "Offline"
+        return {"devicevalue": {"@name": name, "@status": status}}
+
+    return read_cs_device_value
+
+
+@pytest.mark.asyncio
+async def test_leak_topology_is_polled_directly_after_scan():
+    zones = {(1, 1): "Walk-in", (1, 2): "Machine room", (2, 1): "Sales floor"}
+    box = make_box({"read_cs_device_value": leak_site(zones)})
+
+    await box.update_cs_devices()
+    scan_requests = box.xml_interface.count("read_cs_device_value")
+    await box.update_cs_devices()
+
+    assert box.xml_interface.count("read_cs_device_value") == scan_requests + 3
+    devices = box.get_point("255", "-1", "-1", "-1").meta["leak_devices"]
+    assert [d["name"] for d in devices] == ["Walk-in", "Machine room", "Sales floor"]
+
+
+@pytest.mark.asyncio
+async def test_leak_topology_change_triggers_rescan():
+    zones = {(1, 1): "Walk-in", (1, 2): "Machine room"}
+    box = make_box({"read_cs_device_value": leak_site(zones)})
+    await box.update_cs_devices()
+
+    zones[(1, 2)] = "Freezer"
+    await box.update_cs_devices()
+
+    assert box.cs_topology == {(1, 1): "Walk-in", (1, 2): "Freezer"}
+
+
+@pytest.mark.asyncio
+async def test_offline_or_unreachable_leak_zones_do_not_trigger_rescan():
+    zones = {(1, 1): "Walk-in", (1, 2): "Machine room"}
+    site = leak_site(zones)
+    responses = {"read_cs_device_value": site}
+    box = make_box(responses)
+    await box.update_cs_devices()
+    scan_requests = box.xml_interface.count("read_cs_device_value")
+
+    def offline(device_num, zone_num):
+        resp = site(device_num, zone_num)
+        if (device_num, zone_num) == (1, 2):
+            resp["devicevalue"]["@status"] = "Offline"
+        return resp
+
+    responses["read_cs_device_value"] = offline
+    await box.update_cs_devices()
+    devices = box.get_point("255", "-1", "-1", "-1").meta["leak_devices"]
+    assert devices[1] == {"name": "Machine room", "status": "Offline"}
+
+    responses["read_cs_device_value"] = {"@error": "Connection Error"}
+    await box.update_cs_devices()
+    assert box.get_point("255", "-1", "-1", "-1").meta["leak_devices"] == devices
+
+    assert box.xml_interface.count("read_cs_device_value") == scan_requests + 4
+    assert box.cs_topology == zones
+
+
+@pytest.mark.asyncio
+async def test_point_index_merges_records():
+    box = make_box({})
+    await box.add_point({"@nodetype": "2", "@node": "1", "@mod": "0", "@point": "1"})
+    await box.add_point({"@nodetype": "0", "@node": "4", "@mod": "0", "@point": "1"})
+    assert [p.nodetype_id for p in box.yield_points()] == ["2", "0"]
+
+    await box.add_point(
+        {"@nodetype": "2", "@node": "1", "@mod": "0", "@point": "1", "#text": "4.0"}
+    )
+    await box.add_point({"@nodetype": "2", "@node": "2", "@mod": "0", "@point": "1"})
+
+    assert len(box.points) == 3
+    assert [p.key for p in box.yield_points()][:2] == [
+        ("2", "1", "0", "1"),
+        ("2", "2", "0", "1"),
+    ]
+    point = box.get_point(2, 1, 0, 1)
+    assert point.meta["#text"] == "4.0" and point.meta["ip"] == "10.0.0.1"
+
+
+@pytest.mark.asyncio
+async def test_enrichment_is_fetched_once_per_rack_and_suction_group():
+    box = make_box(
+        {
+            "read_devices": {
+                "device": [
+                    {
+                        "@nodetype": "16",
+                        "@node": str(n),
+                        "@mod": "0",
+                        "@point": "0",
+                        "@rack_id": "1",
+                        "@suction_id": str(n % 2 + 1),
+                    }
+                    for n in range(6)
+                ]
+            },
+            "read_condenser": {"setpoint": "95"},
+            "read_suction_group": {"num_circuits": "3"},
+            "read_circuit": lambda rack, suction, circuit: {"circuit": str(circuit)},
+        }
+    )
+    await box.discover_devices()
+
+    assert box.xml_interface.count("read_condenser") == 1
+    assert box.xml_interface.count("read_suction_group") == 2
+    assert box.xml_interface.count("read_circuit") == 6
+    assert [c["circuit"] for c in box.read_circuit[("1", "2")]] == ["1", "2", "3"]
+    point = box.get_point("16", "1", "0", "0")
+    assert point.meta["read_condenser_ref"] == "1"
+    assert point.meta["read_suction_group_ref"] == ("1", "2")
+
+
+@pytest.mark.asyncio
+async def test_address_lists_rebuilt_only_when_points_change():
+    box = make_box({})
+    await box.add_point({"@nodetype": "2", "@node": "1", "@mod": "0", "@point": "1"})
+
+    await box.update_nodetype_2()
+    first = box.address_lists["2"]
+    await box.update_nodetype_2()
+    assert box.address_lists["2"] is first
+
+    await box.add_point({"@nodetype": "0", "@node": "1", "@mod": "0", "@point": "1"})
+    await box.update_nodetype_2()
+    assert box.address_lists["2"] is first
+
+    await box.add_point({"@nodetype": "2", "@node": "1", "@mod": "0", "@point": "2"})
+    await box.update_nodetype_2()
+    assert len(box.address_lists["2"][1]) == 2
+
+
+def test_request_bodies_dropped_on_new_version():
+    interface = DanfossXMLInterface("10.0.0.1")
+    interface.store_body("read_sensor", ("2", 1, (1, 0, 1), 10), "read_sensor", "a")
+    interface.store_body("read_sensor", ("2", 1, (1, 0, 11), 10), "read_sensor", "b")
+
+    assert interface.cached_body("read_sensor", ("2", 1, (1, 0, 11), 10)) == (
+        "read_sensor",
+        "b",
+    )
+    assert interface.cached_body("read_relay", ("2", 1, (1, 0, 11), 10)) is None
+    assert interface.cached_body("read_sensor", None) is None
+
+    interface.store_body("read_sensor", ("2", 2, (1, 0, 1), 10), "read_sensor", "c")
+    assert interface.cached_body("read_sensor", ("2", 1, (1, 0, 1), 10)) is None
+    assert len(interface.request_bodies[("read_sensor", "2")][1]) == 1
+
+
+def test_request_bodies_bounded_per_scope():
+    interface = DanfossXMLInterface("10.0.0.1")
+    interface.max_bodies_per_scope = 2
+    interface.store_body("read_sensor", ("2", 1, (1, 0, 1), 10), "read_sensor", "a")
+    interface.store_body("read_sensor", ("2", 1, (1, 0, 11), 10), "read_sensor", "b")
+    interface.cached_body("read_sensor", ("2", 1, (1, 0, 1), 10))
+    interface.store_body("read_sensor", ("2", 1, (1, 0, 1), 5), "read_sensor", "c")
+
+    bodies = interface.request_bodies[("read_sensor", "2")][1]
+    assert list(bodies) == [((1, 0, 1), 10), ((1, 0, 1), 5)]
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_fails_fast():
+    interface = DanfossXMLInterface("10.0.0.1")
+    for _ in range(interface.breaker.failure_threshold):
+        interface.breaker.record_failure()
+
+    resp = await interface.read_sensor([{"node": 1, "mod": 0, "point": 1}])
+    assert resp == {"@action": "read_sensor", "@error": "Circuit open"}
+    assert interface.failed_requests == 0
+
+
+def test_long_open_breaker_counts_as_failed_connection():
+    interface = DanfossXMLInterface("10.0.0.1")
+    for _ in range(interface.breaker.failure_threshold):
+        interface.breaker.record_failure()
+    assert not interface.connection_failed()
+
+    interface.breaker.open_since -= interface.dead_after_seconds + 1
+    assert interface.connection_failed()
+
+    interface.breaker.record_success()
+    assert not interface.connection_failed()
+
+
+def address(nodetype, point):
+    return {"@nodetype": nodetype, "@node": "1", "@mod": "0", "@point": str(point)}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_replaces_covered_nodetypes():
+    sensor = {**address("2", 1), "@units": "F", "@name": "Case 1", "#text": "5.0"}
+    snapshot = {
+        "point": [
+            {**address("0", 1), "#text": "1"},
+            {**address("2", 1), "@units": "F", "@name": "Case 1 SI", "#text": "4.5"},
+            {**address("2", 2), "@units": "F", "@name": "Case 2", "#text": "5.5"},
+        ]
+    }
+    box = make_box(
+        {
+            "read_points_si": snapshot,
+            "read_sensor": {"sensor": [sensor]},
+            "read_input": {"input": [{**address("0", 1), "#text": "0"}]},
+        }
+    )
+    box.bulk_snapshot = True
+    for record in (address("0", 1), address("1", 1), address("2", 1)):
+        await box.add_point(record)
+
+    # Nodetypes not read on their own yet have no attributes to compare
+    await box.update_point_nodetypes()
+    assert box.xml_interface.count("read_sensor") == 1
+
+    await box.update_point_nodetypes()
+
+    assert box.xml_interface.count("read_sensor") == 1
+    # Points without units on both sides keep their own reads
+    assert box.xml_interface.count("read_input") == 2
+    assert box.xml_interface.count("read_relay") == 2
+    assert box.get_point("2", "1", "0", "1").meta["#text"] == "4.5"
+    assert box.get_point("2", "1", "0", "1").meta["@name"] == "Case 1 SI"
+    # Points the snapshot alone knows of are left to discovery
+    assert box.get_point("2", "1", "0", "2") is None
+
+
+@pytest.mark.asyncio
+async def test_snapshot_skips_nodetypes_in_other_units():
+    snapshot = {"point": [{**address("2", 1), "@units": "C", "#text": "-15.0"}]}
+    sensor = {**address("2", 1), "@units": "F", "#text": "5.0"}
+    box = make_box({"read_points_si": snapshot, "read_sensor": {"sensor": [sensor]}})
+    box.bulk_snapshot = True
+    await box.add_point(sensor)
+
+    await box.update_point_nodetypes()
+    await box.update_point_nodetypes()
+
+    assert box.snapshot_supported is True
+    assert box.xml_interface.count("read_sensor") == 2
+    assert box.get_point("2", "1", "0", "1").meta["#text"] == "5.0"
+
+
+@pytest.mark.asyncio
+async def test_snapshot_skips_nodetypes_with_fewer_attributes():
+    snapshot = {"point": [{**address("2", 1), "@units": "F", "#text": "4.5"}]}
+    sensor = {**address("2", 1), "@units": "F", "@alarm": "1", "#text": "5.0"}
+    box = make_box({"read_points_si": snapshot, "read_sensor": {"sensor": [sensor]}})
+    box.bulk_snapshot = True
+    await box.add_point(address("2", 1))
+
+    await box.update_point_nodetypes()
+    await box.update_point_nodetypes()
+
+    assert box.xml_interface.count("read_sensor") == 2
+    assert box.get_point("2", "1", "0", "1").meta["#text"] == "5.0"
+
+
+@pytest.mark.asyncio
+async def test_unsupported_snapshot_is_not_retried():
+    box = make_box(
+        {"read_points_si": {"@action": "read_points_si", "@error": "unknown action"}}
+    )
+    box.bulk_snapshot = True
+    await box.add_point(address("2", 1))
+
+    await box.update_point_nodetypes()
+    await box.update_point_nodetypes()
+
+    assert box.snapshot_supported is False
+    assert box.xml_interface.count("read_points_si") == 1
+    assert box.xml_interface.count("read_sensor") == 2
@@ -0,0 +1,330 @@
+import srcpath
+import pytest
+from bms.E2HttpBox import E2HttpBox, Controller, Cell
+from bms.E2Celltypes import celltype_index
+
+
+class FakeE2Interface:
+    def __init__(self, max_props: int | None = None):
+        self.timeout_seconds = 3
+        self.max_concurrent_requests = 2
+        self.max_props = max_props
+        self.requests: list[list[str]] = []
+        self.alarms: list[dict] | None = []
+
+    async def get_alarm_list(self, controller: str):
+        if self.alarms is None:
+            return {}
+        return {"result": {"data": self.alarms}}
+
+    async def get_multi_expanded_status_buffer(self, request_list: list):
+        self.requests.append(request_list)
+        if self.max_props == 0:
+            return {}
+        if self.max_props is not None and len(request_list) > self.max_props:
+            return {"error": "Malformed response"}
+        return {"result": {"data": [entry(prop) for prop in reversed(request_list)]}}
+
+    def latency_summary(self) -> dict:
+        return {}
+
+
+def entry(prop: str) -> dict:
+    return {
+        "prop": prop,
+        "alarm": False,
+        "bypasstime": "",
+        "dataType": "1",
+        "engUnits": "DF",
+        "fail": False,
+        "notice": False,
+        "override": False,
+        "ovtime": "",
+        "ovtype": "",
+        "value": prop.rsplit(":", 1)[-1],
+    }
+
+
+def make_box() -> E2HttpBox:
+    box = E2HttpBox("10.0.0.3", "test_e2")
+    box.http_interface = FakeE2Interface()
+    controller = Controller("E2", "RX-1", 1, "4.0", "RX", 1)
+    for name, celltype in (("SUCTION A", 94), ("CASE 1", 131)):
+        controller.cells.append(Cell(name, name, "", "RX-1", celltype))
+    box.controllers = [controller]
+    return box
+
+
+@pytest.mark.asyncio
+async def test_buffered_poll_maps_entries_to_cells():
+    box = make_box()
+    box.max_buffer_size = 7
+
+    await box.poll_all_buffered()
+
+    suction, case = box.controllers[0].cells
+    celltypes = celltype_index()
+    assert len(suction.points) == len(celltypes.properties("94"))
+    assert len(case.points) == len(celltypes.properties("131"))
+    idx = celltypes.properties("131")[0]
+    assert case.points[celltypes.property_name("131", idx)].value == idx
+    assert sum(len(r) for r in box.http_interface.requests) == len(box.prop_index)
+
+
+@pytest.mark.asyncio
+async def test_failed_chunks_are_split_not_dropped():
+    box = make_box()
+    box.http_interface.max_props = 8
+    box.max_buffer_size = 30
+
+    await box.poll_all_buffered()
+
+    suction, case = box.controllers[0].cells
+    assert len(suction.points) + len(case.points) == len(box.prop_index)
+
+
+@pytest.mark.asyncio
+async def test_sweep_stops_when_controller_does_not_answer():
+    box = make_box()
+    box.http_interface.max_props = 0
+    box.max_buffer_size = 10
+
+    await box.poll_all_buffered()
+
+    assert (
+        len(box.http_interface.requests) <= box.http_interface.max_concurrent_requests
+    )
+
+
+@pytest.mark.asyncio
+async def test_property_tiers_limit_requests():
+    box = make_box()
+    celltypes = celltype_index()
+    case_props = celltypes.properties("131")
+    control = celltypes.property_name("131", case_props[0])
+    setpoint = celltypes.property_name("131", case_props[1])
+    box.property_tiers = {"94:*": -1, "131:*": 3, control: 1, setpoint: 0}
+
+    for _ in range(4):
+        await box.poll_all_buffered()
+
+    requested = [
+        [prop.rsplit(":", 1)[-1] for prop in request]
+        for request in box.http_interface.requests
+    ]
+    assert sorted(requested[0]) == sorted(case_props)
+    assert requested[1] == requested[2] == [case_props[0]]
+    assert sorted(requested[3]) == sorted(case_props[:1] + case_props[2:])
+
+
+def alarm(advid: int, state: str = "ALARM") -> dict:
+    return {
+        "acked": False,
+        "acktimestamp": "",
+        "ackuser": "",
+        "advcode": 1,
+        "advid": advid,
+        "alarm": True,
+        "engUnits": "DF",
+        "fail": False,
+        "limit": "10",
+        "notice": False,
+        "priority": 20,
+        "reportvalue": "12",
+        "reset": False,
+        "rtn": False,
+        "rtntimestamp": "",
+        "source": "RX-1:CASE 1",
+        "state": state,
+        "text": "High temp",
+        "timestamp": "",
+        "unacked": True,
+    }
+
+
+def alarm_records(data: list[dict]) -> dict[str, tuple]:
+    return {
+        r["@point"]: (r["state"], r["cleared"])
+        for r in data
+        if r["@point"].startswith("alarm_")
+    }
+
+
+@pytest.mark.asyncio
+async def test_only_alarm_changes_are_emitted():
+    box = make_box()
+    box.http_interface.alarms = [alarm(1), alarm(2)]
+    await box.poll_all_buffered()
+    assert alarm_records(box.get_data()) == {
+        "alarm_1": ("ALARM", False),
+        "alarm_2": ("ALARM", False),
+    }
+    box.clear_alarm_changes()
+
+    await box.poll_all_buffered()
+    assert alarm_records(box.get_data()) == {}
+
+    box.http_interface.alarms = [alarm(1, state="ACKED"), alarm(3)]
+    await box.poll_all_buffered()
+    assert alarm_records(box.get_data()) == {
+        "alarm_1": ("ACKED", False),
+        "alarm_2": ("ALARM", True),
+        "alarm_3": ("ALARM", False),
+    }
+    box.clear_alarm_changes()
+
+    assert alarm_records(box.get_data(full_frame=True)) == {
+        "alarm_1": ("ACKED", False),
+        "alarm_3": ("ALARM", False),
+    }
+
+
+@pytest.mark.asyncio
+async def test_failed_alarm_poll_keeps_known_alarms():
+    box = make_box()
+    box.http_interface.alarms = [alarm(1)]
+    await box.poll_all_buffered()
+    box.get_data()
+    box.clear_alarm_changes()
+
+    box.http_interface.alarms = None
+    await box.poll_all_buffered()
+
+    assert alarm_records(box.get_data()) == {}
+    assert list(box.controllers[0].alarms) == [1]
+
+
+@pytest.mark.asyncio
+async def test_alarm_changes_kept_until_cleared():
+    box = make_box()
+    box.http_interface.alarms = [alarm(1)]
+    await box.poll_all_buffered()
+    list(box.get_rows())
+
+    # Not sent: the same changes are emitted again
+    assert alarm_records(box.get_data()) == {"alarm_1": ("ALARM", False)}
+
+    box.http_interface.alarms = [alarm(1), alarm(2)]
+    await box.poll_all_buffered()
+    box.clear_alarm_changes()
+    assert alarm_records(box.get_data()) == {"alarm_2": ("ALARM", False)}
+
+
+@pytest.mark.asyncio
+async def test_full_frame_keeps_returned_to_normal_alarms():
+    box = make_box()
+    box.http_interface.alarms = [alarm(1), alarm(2)]
+    await box.poll_all_buffered()
+    box.get_data()
+    box.clear_alarm_changes()
+
+    box.http_interface.alarms = [alarm(1)]
+    await box.poll_all_buffered()
+    assert alarm_records(box.get_data(full_frame=True)) == {
+        "alarm_1": ("ALARM", False),
+        "alarm_2": ("ALARM", True),
+    }
+    box.clear_alarm_changes()
+    assert alarm_records(box.get_data()) == {}
+
+
+@pytest.mark.asyncio
+async def test_unsent_changes_published_next_cycle(tmp_path):
+    from database.DBInterface import DBInterface
+    from store.Store import Store
+
+    class FakeDevice:
+        def __init__(self):
+            self.fail = True
+            self.sent: list[list[dict]] = []
+
+        async def send_message(self, data):
+            if self.fail:
+                return False
+            self.sent.append(data)
+            return True
+
+    box = make_box()
+    box.initialized = True
+    db = DBInterface()
+    db.db_path = tmp_path / "cov.db"
+    store = Store(edge_device=FakeDevice(), db_interface=db)
+    store.emerson2http_panels = [box]
+    try:
+        await store.gather_and_send_emerson2http()
+        box.http_interface.alarms = [alarm(1)]
+        await store.gather_and_send_emerson2http()
+
+        store.edge_device.fail = False
+        await store.gather_and_send_emerson2http()
+        records = store.edge_device.sent[0][0]["records"]
+        assert ["E2", "RX-1", "4.0", "alarm_1", "state", "ALARM"] in records
+        assert any(r[3] == "CASE 1" for r in records)
+
+        await store.gather_and_send_emerson2http()
+        resent = [r for p in store.edge_device.sent[1] for r in p["records"]]
+        assert not [r for r in resent if r[3] == "alarm_1"]
+    finally:
+        await db.close()
+
+
+@pytest.mark.asyncio
+async def test_rows_match_flattened_records():
+    from database.DBInterface import DBInterface
+
+    box = make_box()
+    box.http_interface.alarms = [alarm(1)]
+    await box.poll_all_buffered()
+
+    frame = DBInterface().raw_data_to_df(box.get_data(full_frame=True))
+    expected = [tuple(row) for row in frame.values.tolist()]
+    assert sorted(box.get_rows(full_frame=True), key=repr) == sorted(expected, key=repr)
+
+
+@pytest.mark.asyncio
+async def test_cov_rows_only_returns_changes(tmp_path):
+    from database.DBInterface import DBInterface
+
+    db = DBInterface()
+    db.db_path = tmp_path / "cov.db"
+    rows = [
+        ("E2", "RX-1", "4.0", "CASE 1", "10.0.0.3", "CASE TEMP 1__value", "38"),
+        ("E2", "RX-1", "4.0", "CASE 1", "10.0.0.3", "CASE TEMP 1__ovtime", None),
+    ]
+    try:
+        first = await db.fetch_cov_rows(rows)
+        assert first[0]["device"] == "10.0.0.3"
+        assert first[0]["records"][1][-1] == "novalue"
+
+        rows[0] = (*rows[0][:6], "39")
+        second = await db.fetch_cov_rows(rows)
+        assert second[0]["records"] == [
+            ["E2", "RX-1", "4.0", "CASE 1", "CASE TEMP 1__value", "39"]
+        ]
+        assert len((await db.fetch_cov_rows(rows, full_frame=True))[0]["records"]) == 2
+    finally:
+        await db.close()
+
+
+@pytest.mark.asyncio
+async def test_cov_rows_compare_bools_as_stored(tmp_path):
+    from database.DBInterface import DBInterface
+
+    db = DBInterface()
+    db.db_path = tmp_path / "cov.db"
+    rows = [
+        ("E2", "RX-1", "4.0", "CASE 1", "10.0.0.3", "CASE TEMP 1__fail", False),
+        ("E2", "RX-1", "4.0", "CASE 1", "10.0.0.3", "CASE TEMP 1__alarm", True),
+    ]
+    try:
+        first = await db.fetch_cov_rows(rows)
+        assert [r[-1] for r in first[0]["records"]] == [False, True]
+        assert await db.fetch_cov_rows(rows) == []
+
+        rows[0] = (*rows[0][:6], True)
+        changed = await db.fetch_cov_rows(rows)
+        assert changed[0]["records"] == [
+            ["E2", "RX-1", "4.0", "CASE 1", "CASE TEMP 1__fail", True]
+        ]
+    finally:
+        await db.close()
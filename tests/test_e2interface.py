@@ -0,0 +1,249 @@
+import srcpath
+import asyncio
+import json
+import pytest
+from bms.E2HttpInterface import E2HttpInterface
+
+
+def fake_controller(
+    interface: E2HttpInterface, accepts_batch: bool, batch_fails: bool = False
+):
+    posts: list = []
+
+    async def post_jsonrpc(payload):
+        posts.append(payload)
+        if isinstance(payload, list):
+            if batch_fails:
+                return {}
+            if not accepts_batch:
+                return {"id": None, "error": "invalid request"}
+            return [
+                {"id": p["id"], "result": {"data": [p["params"][0]]}}
+                for p in reversed(payload)
+            ]
+        return {"id": 0, "result": {"data": [payload["params"][0]]}}
+
+    interface._post_jsonrpc = post_jsonrpc
+    return posts
+
+
+@pytest.mark.asyncio
+async def test_cell_lists_batched():
+    interface = E2HttpInterface("10.0.0.3")
+    posts = fake_controller(interface, accepts_batch=True)
+
+    resp = await interface.get_cell_lists(["RX-1", "RX-2", "BX-1"])
+
+    assert [r["result"]["data"] for r in resp] == [["RX-1"], ["RX-2"], ["BX-1"]]
+    assert len(posts) == 1
+
+
+@pytest.mark.asyncio
+async def test_cell_lists_fall_back_to_single_calls():
+    interface = E2HttpInterface("10.0.0.3")
+    posts = fake_controller(interface, accepts_batch=False)
+
+    await interface.get_cell_lists(["RX-1", "RX-2"])
+    resp = await interface.get_cell_lists(["RX-1", "RX-2"])
+
+    assert [r["result"]["data"] for r in resp] == [["RX-1"], ["RX-2"]]
+    assert interface.batch_supported is False
+    assert len(posts) == 5
+
+
+@pytest.mark.asyncio
+async def test_single_calls_run_together():
+    interface = E2HttpInterface("10.0.0.3")
+    interface.batch_supported = False
+    in_flight = [0, 0]
+
+    async def post_jsonrpc(payload):
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight[1], in_flight[0])
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        return {"id": 0, "result": {"data": [payload["params"][0]]}}
+
+    interface._post_jsonrpc = post_jsonrpc
+    resp = await interface.get_cell_lists([f"RX-{i}" for i in range(3)])
+
+    assert [r["result"]["data"] for r in resp] == [[f"RX-{i}"] for i in range(3)]
+    assert in_flight[1] == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_probed_again():
+    interface = E2HttpInterface("10.0.0.3")
+    posts = fake_controller(interface, accepts_batch=True, batch_fails=True)
+
+    resp = await interface.get_cell_lists(["RX-1", "RX-2"])
+    assert [r["result"]["data"] for r in resp] == [["RX-1"], ["RX-2"]]
+    assert interface.batch_supported is None
+
+    fake_controller(interface, accepts_batch=True)
+    await interface.get_cell_lists(["RX-1", "RX-2"])
+    assert interface.batch_supported is True
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_sent_as_single_calls_once_supported():
+    interface = E2HttpInterface("10.0.0.3")
+    fake_controller(interface, accepts_batch=True)
+    await interface.get_cell_lists(["RX-1", "RX-2"])
+
+    posts = fake_controller(interface, accepts_batch=True, batch_fails=True)
+    resp = await interface.get_cell_lists(["RX-1", "RX-2", "BX-1"])
+
+    assert [r["result"]["data"] for r in resp] == [["RX-1"], ["RX-2"], ["BX-1"]]
+    assert len(posts) == 4
+    assert interface.batch_supported is True
+
+
+def fake_sessions(interface: E2HttpInterface, failing: dict):
+    posts: list[str] = []
+
+    async def post_with_session(session, payload, mode):
+        posts.append(mode)
+        return failing.get(mode, {"result": {"data": []}})
+
+    interface._post_with_session = post_with_session
+    return posts
+
+
+@pytest.mark.asyncio
+async def test_persistent_session_is_reused():
+    interface = E2HttpInterface("10.0.0.3")
+    interface.persistent_session = True
+    interface.http_request_delay = 0
+    posts = fake_sessions(interface, failing={})
+
+    await interface._post_jsonrpc({})
+    session = interface._session
+    await interface._post_jsonrpc({})
+
+    assert posts == ["persistent", "persistent"]
+    assert interface._session is session
+    await interface.close()
+
+
+@pytest.mark.asyncio
+async def test_persistent_session_falls_back_on_errors():
+    interface = E2HttpInterface("10.0.0.3")
+    interface.persistent_session = True
+    interface.http_request_delay = 0
+    failing = {"persistent": None}
+    posts = fake_sessions(interface, failing)
+
+    assert await interface._post_jsonrpc({}) == {"result": {"data": []}}
+    await interface._post_jsonrpc({})
+    assert posts == ["persistent", "per_request", "per_request"]
+
+    # Persistent mode is tried again after the cooldown
+    interface.persistent_paused_until = 0.0
+    failing.clear()
+    await interface._post_jsonrpc({})
+    assert posts[-1] == "persistent"
+    await interface.close()
+
+
+@pytest.mark.asyncio
+async def test_malformed_response_keeps_persistent_session():
+    interface = E2HttpInterface("10.0.0.3")
+    interface.persistent_session = True
+    interface.http_request_delay = 0
+    malformed = {"error": "Malformed response"}
+    posts = fake_sessions(interface, failing={"persistent": malformed})
+
+    assert await interface._post_jsonrpc({}) == malformed
+    assert posts == ["persistent"]
+    assert interface.persistent_paused_until == 0.0
+    await interface.close()
+
+
+class FakeResponse:
+    status = 200
+
+    async def text(self):
+        return '{"result": {"data": []}}'
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.posts = 0
+        self.closed = False
+
+    def post(self, endpoint, json):
+        self.posts += 1
+        if self.error:
+            raise self.error
+        return FakeResponse()
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_dropped_keep_alive_falls_back_to_per_request():
+    import aiohttp
+
+    interface = E2HttpInterface("10.0.0.3")
+    interface.persistent_session = True
+    interface.http_request_delay = 0
+    persistent = FakeSession(aiohttp.ServerDisconnectedError())
+    per_request = FakeSession()
+
+    async def lease_session():
+        return persistent
+
+    interface._lease_session = lease_session
+    interface._new_session = lambda: per_request
+
+    assert await interface._post_jsonrpc({}) == {"result": {"data": []}}
+    assert (persistent.posts, per_request.posts) == (1, 1)
+    assert interface.persistent_paused_until > 0
+
+
+def test_celltype_index_keeps_table_order():
+    from bms.E2Celltypes import CelltypeIndex, celltype_index
+
+    table = "65\t2048.0\tOUTPUT\n65\t4.0\tANALOG INPUT1\n94\t1.0\tSUCT PRES\n"
+    index = CelltypeIndex(table)
+    assert index.properties(65) == ("2048.0", "4.0")
+    assert index.property_name("94", "1.0") == "SUCT PRES"
+    assert index.properties("131") == ()
+    assert len(index) == 3
+
+    assert celltype_index() is celltype_index()
+    assert len(celltype_index()) == 547
+
+
+def test_decoder_repairs_unescaped_quotes():
+    from bms.E2JSONDecoder import decode_response
+
+    good = '{"result": {"data": [{"prop": "RX-1:CASE 1:1.0", "value": "38"}]}}'
+    assert decode_response(good) == (json.loads(good), [])
+
+    bad = (
+        '{"result": {"data": ['
+        '{"prop": "RX-1:CASE 1:1.0", "value": "38"}, '
+        '{"prop": "RX-1:CASE 12"DR:2.0", "value": "4"}, '
+        '{"prop": "RX-1:CASE 3:3.0", "value": "12"x"}]}}'
+    )
+    ret, repaired = decode_response(bad)
+    assert [e["prop"] for e in ret["result"]["data"]] == [
+        "RX-1:CASE 1:1.0",
+        "RX-1:CASE 12DR:2.0",
+        "RX-1:CASE 3:3.0",
+    ]
+    assert ret["result"]["data"][2]["value"] == "12x"
+    assert repaired == ["RX-1:CASE 12DR:2.0", "RX-1:CASE 3:3.0"]
+
+    with pytest.raises(json.JSONDecodeError):
+        decode_response('{"result": ')
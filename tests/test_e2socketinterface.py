@@ -0,0 +1,64 @@
+import srcpath
+import asyncio
+import pytest
+from bms.E2SocketInterface import E2SocketInterface
+
+
+async def fake_controller(responses: list[bytes]):
+    """An E2 stand-in answering each connection with the next response."""
+    commands: list[bytes] = []
+
+    async def handle(reader, writer):
+        commands.append(await reader.read(4096))
+        response = responses.pop(0)
+        if response:
+            writer.write(response)
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, commands
+
+
+def make_interface(server) -> E2SocketInterface:
+    interface = E2SocketInterface("127.0.0.1", server.sockets[0].getsockname()[1])
+    interface.proxy_url = None
+    interface.request_delay = 0
+    interface.tcp_delay = 0
+    interface.recv_timeout = 0.5
+    return interface
+
+
+@pytest.mark.asyncio
+async def test_requests_do_not_block_the_loop():
+    server, commands = await fake_controller([b"controllers"])
+    interface = make_interface(server)
+    interface.request_delay = 0.2
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    async with server:
+        assert await interface.get_controllers() == b"controllers"
+    task.cancel()
+
+    assert commands[0].startswith(bytes.fromhex("43 50 43 52"))
+    assert ticks >= 10
+    assert interface.socket_open is False
+
+
+@pytest.mark.asyncio
+async def test_empty_response_is_retried_on_a_new_connection():
+    server, commands = await fake_controller([b"", b"status"])
+    interface = make_interface(server)
+
+    async with server:
+        resp = await interface.get_cell_status(1, "01 02", [2048])
+
+    assert resp == b"status"
+    assert len(commands) == 2
@@ -0,0 +1,158 @@
+import srcpath
+import pytest
+from bms.E3Box import E3Box, Group, Application, Pid
+
+
+class FakeE3Interface:
+    def __init__(self, log_groups: dict | None = None, max_points: int = 0):
+        self.timeout = 3
+        self.requests: list[list[dict]] = []
+        self.max_points = max_points
+        self.responding = True
+        self.log_groups = log_groups or {}
+        self.described: list[str] = []
+
+    async def get_default_log_group(self):
+        return {"result": {"lgriid": list(self.log_groups)}}
+
+    async def get_apps_for_log_group(self, lgriid: str):
+        ptrs = [{"ptr": ptr} for ptr in self.log_groups[lgriid]]
+        return {"result": {"loggedpoints": ptrs}}
+
+    async def get_app_descriptions(self, iids: list[str], slots=None):
+        self.described.extend(iids)
+        return [
+            {
+                "result": {
+                    "points": [{"pid": str(p), "desc": f"{iid} {p}"} for p in range(3)]
+                }
+            }
+            for iid in iids
+        ]
+
+    async def get_point_values(self, points: list[dict]):
+        self.requests.append(points)
+        if not self.responding:
+            return None
+        if self.max_points and len(points) > self.max_points:
+            return {"error": {"code": -32000, "message": "Response too large"}}
+        return {
+            "result": {
+                "points": [{"ptr": p["ptr"], "val": p["ptr"][-1]} for p in points]
+            }
+        }
+
+
+def make_box(apps: int, pids: int) -> E3Box:
+    box = E3Box("10.0.0.2", "test_e3")
+    box.http_interface = FakeE3Interface()
+    group = box.groups["Racks"] = Group({"id": "1", "name": "Racks"})
+    for a in range(apps):
+        app = Application({"iid": f"app{a}", "categorydef": "Racks"}, group)
+        app.pids = {str(p): Pid(str(p), {"desc": f"Point {p}"}) for p in range(pids)}
+        group.applications[app.iid] = app
+    box.build_index()
+    return box
+
+
+@pytest.mark.asyncio
+async def test_point_values_batched_across_applications():
+    box = make_box(apps=20, pids=5)
+    box.max_points_per_request = 40
+    box.build_index()
+
+    await box.get_values()
+
+    assert [len(r) for r in box.http_interface.requests] == [40, 40, 20]
+    pid = box.groups["Racks"].applications["app7"].pids["3"]
+    assert pid.present_value == "3"
+
+
+@pytest.mark.asyncio
+async def test_failed_buffer_is_split_until_points_are_read():
+    box = make_box(apps=10, pids=5)
+    box.http_interface.max_points = 12
+    box.max_points_per_request = 50
+
+    await box.get_values()
+
+    assert [len(r) for r in box.http_interface.requests[:3]] == [50, 25, 12]
+    assert all(
+        pid.present_value == pid.pid
+        for app in box.groups["Racks"].applications.values()
+        for pid in app.pids.values()
+    )
+
+
+@pytest.mark.asyncio
+async def test_point_values_stop_when_unit_does_not_answer():
+    box = make_box(apps=10, pids=5)
+    box.http_interface.responding = False
+    box.max_points_per_request = 20
+
+    await box.get_values()
+
+    assert [len(r) for r in box.http_interface.requests] == [20]
+    assert box.chunker.size == 20
+
+
+@pytest.mark.asyncio
+async def test_response_without_points_is_split():
+    box = make_box(apps=4, pids=5)
+    box.max_points_per_request = 20
+
+    async def no_points(points):
+        box.http_interface.requests.append(points)
+        return {"result": {}}
+
+    box.http_interface.get_point_values = no_points
+    await box.get_values()
+
+    assert [len(r) for r in box.http_interface.requests[:2]] == [20, 10]
+
+
+@pytest.mark.asyncio
+async def test_logged_points_described_once_per_application():
+    box = make_box(apps=3, pids=0)
+    box.http_interface = FakeE3Interface(
+        {
+            "lg1": ["app0:0", "app1:0", "app1:1"],
+            "lg2": ["app1:2", "app2:0", "app9:0"],
+        }
+    )
+
+    await box.get_logged_points()
+
+    assert box.http_interface.described == ["app0", "app1", "app2", "app9"]
+    app1 = box.groups["Racks"].applications["app1"]
+    assert sorted(app1.pids) == ["0", "1", "2"]
+    assert app1.pids["2"].normal_name == "app1 2"
+    assert len(box.ptr_index) == 5
+
+
+def test_records_built_from_index():
+    box = make_box(apps=2, pids=2)
+    box.unit_info = {"ip": "10.0.0.2"}
+    box.build_index()
+    app = box.groups["Racks"].applications["app1"]
+    app.pids["1"].present_value = 7.5
+    app.alarms = [{"iid": "app1", "msg": "High temp"}]
+
+    data = box.get_data()
+
+    assert len(data) == 5
+    assert data[2] == {
+        "@nodetype": "E3",
+        "@node": "Racks",
+        "@mod": "app1",
+        "ip": "10.0.0.2",
+        "appname": None,
+        "apptype": None,
+        "category": None,
+        "categorydef": "Racks",
+        "alarms": app.alarms,
+        "@point": "alarm_record",
+        "description": "Application-level alarms",
+    }
+    assert data[4]["@point"] == "1" and data[4]["val"] == 7.5
+    assert data[4]["description"] == "Point 1"
@@ -0,0 +1,272 @@
+import srcpath
+import aiohttp
+import asyncio
+import json
+import pytest
+from urllib.parse import urlencode
+from bms.E3HttpInterface import E3HttpInterface
+
+
+class FakeE3:
+    """Answers the JSON-RPC methods an E3 unit would, by method name."""
+
+    def __init__(self, interface: E3HttpInterface, accepts_batch: bool = True):
+        self.calls: list[str] = []
+        self.closed_sids: set[str] = set()
+        self.sessions = 0
+        self.accepts_batch = accepts_batch
+        self.batch_fails = False
+        self.batches = 0
+        self.batch_queries: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed_mid_request = 0
+        self.interface = interface
+        interface._send_get = self.send
+        interface._post_query = self.post_query
+        interface.request_delay = 0
+
+    async def post_query(self, query: dict):
+        payload = json.loads(query["m"])
+        if not isinstance(payload, list):
+            return await self.send(payload["method"], payload.get("params"))
+
+        self.batches += 1
+        self.batch_queries.append(urlencode(query))
+        if self.batch_fails:
+            return None
+        if not self.accepts_batch:
+            return {"error": {"code": -32600, "message": "Invalid Request"}}
+        responses = [
+            {**await self.send(p["method"], p.get("params")), "id": p["id"]}
+            for p in payload
+        ]
+        return responses[::-1]
+
+    async def send(self, method: str, params: dict | None = None):
+        self.calls.append(method)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        session = self.interface.session
+        try:
+            await asyncio.sleep(0.001)
+            if session is not None and session.closed:
+                self.closed_mid_request += 1
+            return self.respond(method, params)
+        finally:
+            self.in_flight -= 1
+
+    def respond(self, method: str, params: dict | None):
+        if method == "GetSessionID":
+            self.sessions += 1
+            return {"result": {"sid": f"sid{self.sessions}"}}
+        if method == "Login":
+            return {"result": {"permissions": {"read": 1}}}
+        if params and params.get("sid") in self.closed_sids:
+            return {"error": {"data": "Session has been closed, please refresh"}}
+        if method == "GetAppDescription":
+            return {"result": {"iid": params["iid"]}}
+        return {"result": {"alarms": []}}
+
+    def count(self, method: str) -> int:
+        return self.calls.count(method)
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused_within_lifetime():
+    interface = E3HttpInterface("10.0.0.2")
+    unit = FakeE3(interface)
+    interface.session_lifetime = 300
+
+    for _ in range(3):
+        await interface.get_alarms()
+    await interface._close_session()
+
+    assert unit.count("GetSessionID") == 1
+    assert unit.count("Login") == 1
+    assert unit.count("GetAlarms") == 3
+
+
+@pytest.mark.asyncio
+async def test_session_renewed_when_closed_by_unit():
+    interface = E3HttpInterface("10.0.0.2")
+    unit = FakeE3(interface)
+    interface.session_lifetime = 300
+
+    await interface.get_alarms()
+    unit.closed_sids.add(interface.session_id)
+    resp = await interface.get_alarms()
+    await interface._close_session()
+
+    assert resp == {"result": {"alarms": []}}
+    assert unit.count("Login") == 2
+
+
+@pytest.mark.asyncio
+async def test_zero_lifetime_logs_in_every_call():
+    interface = E3HttpInterface("10.0.0.2")
+    unit = FakeE3(interface)
+    interface.session_lifetime = 0
+
+    await interface.get_alarms()
+    await interface.get_alarms()
+    await interface._close_session()
+
+    assert unit.count("Login") == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_results_matched_by_id():
+    interface = E3HttpInterface("10.0.0.2")
+    unit = FakeE3(interface)
+    interface.max_batch_calls = 4
+
+    resp = await interface.get_app_descriptions([f"app{i}" for i in range(6)])
+    await interface._close_session()
+
+    assert [r["result"]["iid"] for r in resp] == [f"app{i}" for i in range(6)]
+    assert unit.batches == 2
+    assert interface.batch_supported is True
+
+
+@pytest.mark.asyncio
+async def test_batch_falls_back_to_single_calls():
+    interface = E3HttpInterface("10.0.0.2")
+    unit = FakeE3(interface, accepts_batch=False)
+    interface.max_batch_calls = 4
+
+    slots = asyncio.Semaphore(3)
+    resp = await interface.get_app_descriptions([f"app{i}" for i in range(6)], slots)
+    await interface._close_session()
+
+    assert [r["result"]["iid"] for r in resp] == [f"app{i}" for i in range(6)]
+    assert 1 < unit.max_in_flight <= 3
+    assert unit.batches == 1
+    assert unit.count("GetAppDescription") == 6
+    assert interface.batch_supported is False
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_probed_again():
+    interface = E3HttpInterface("10.0.0.2")
+    unit = FakeE3(interface)
+    unit.batch_fails = True
+
+    resp = await interface.get_app_descriptions(["app0", "app1"])
+    assert [r["result"]["iid"] for r in resp] == ["app0", "app1"]
+    assert interface.batch_supported is None
+
+    unit.batch_fails = False
+    await interface.get_app_descriptions(["app0", "app1"])
+    await interface._close_session()
+    assert interface.batch_supported is True
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_sent_as_single_calls_once_supported():
+    interface = E3HttpInterface("10.0.0.2")
+    unit = FakeE3(interface)
+    await interface.get_app_descriptions(["app0", "app1"])
+    unit.batch_fails = True
+
+    resp = await interface.get_app_descriptions(["app2", "app3"])
+    await interface._close_session()
+
+    assert [r["result"]["iid"] for r in resp] == ["app2", "app3"]
+    assert interface.batch_supported is True
+    assert interface.batch_breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_replaced_session_outlives_requests_in_flight():
+    interface = E3HttpInterface("10.0.0.2")
+    unit = FakeE3(interface)
+    interface.session_lifetime = 0
+
+    await asyncio.gather(*(interface.get_alarms() for _ in range(5)))
+
+    assert unit.count("GetSessionID") == 5
+    assert unit.closed_mid_request == 0
+    assert interface.retired_sessions == []
+    await interface._close_session()
+
+
+@pytest.mark.asyncio
+async def test_batches_capped_by_query_length():
+    interface = E3HttpInterface("10.0.0.2")
+    unit = FakeE3(interface)
+    interface.max_query_bytes = 600
+
+    iids = [f"app{i}" for i in range(20)]
+    resp = await interface.get_app_descriptions(iids)
+    await interface._close_session()
+
+    assert [r["result"]["iid"] for r in resp] == iids
+    assert unit.batches > 1
+    assert all(len(q) <= 600 for q in unit.batch_queries)
+
+
+@pytest.mark.asyncio
+async def test_failing_batches_skipped_for_a_while():
+    interface = E3HttpInterface("10.0.0.2")
+    unit = FakeE3(interface)
+    interface.max_batch_calls = 2
+    await interface.get_app_descriptions(["app0", "app1"])
+    unit.batch_fails = True
+
+    # Failed batches are sent as single calls
+    resp = await interface.get_app_descriptions([f"app{i}" for i in range(6)])
+    assert [r["result"]["iid"] for r in resp] == [f"app{i}" for i in range(6)]
+    assert unit.batches == 3
+
+    # Probed again once the back-off has passed
+    unit.batch_fails = False
+    interface.batch_breaker.opened_at -= interface.batch_breaker.reset_seconds
+    await interface.get_app_descriptions(["app0", "app1"])
+    await interface._close_session()
+    assert unit.batches == 4
+    assert interface.batch_breaker.state == "closed"
+
+
+class FlakySession:
+    """Fails its first post after another request replaced the session."""
+
+    def __init__(self, interface: E3HttpInterface):
+        self.interface = interface
+        self.posts = 0
+
+    def post(self, *args, **kwargs):
+        self.posts += 1
+        if self.posts == 1:
+            self.interface.session = None
+            raise aiohttp.ClientConnectionError("reset")
+        return FakeResponse('{"result": {}}')
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.body = text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def text(self):
+        return self.body
+
+
+@pytest.mark.asyncio
+async def test_retries_stay_on_the_leased_session():
+    interface = E3HttpInterface("10.0.0.2")
+    interface.request_delay = 0
+    session = interface.session = FlakySession(interface)
+
+    resp = await interface._send_post("GetAlarms", {"sid": "sid1"})
+
+    assert resp == {"result": {}}
+    assert session.posts == 2
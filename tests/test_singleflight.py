@@ -0,0 +1,65 @@
+import srcpath
+import asyncio
+import pytest
+from core import single_flight
+
+
+class FakeInterface:
+    def __init__(self, responses: list):
+        self.responses = responses
+        self.calls = 0
+
+    @single_flight(ttl=30)
+    async def read(self, key: str):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.responses.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_reads_share_one_request():
+    interface = FakeInterface([{"value": 1}])
+    results = await asyncio.gather(*(interface.read("a") for _ in range(5)))
+
+    assert interface.calls == 1
+    assert results == [{"value": 1}] * 5
+
+
+@pytest.mark.asyncio
+async def test_results_memoized_per_arguments():
+    interface = FakeInterface([{"value": 1}, {"value": 2}])
+    assert await interface.read("a") == {"value": 1}
+    assert await interface.read("a") == {"value": 1}
+    assert await interface.read("b") == {"value": 2}
+    assert interface.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_memoized():
+    interface = FakeInterface([{"@error": "Connection Error"}, {}, {"value": 1}])
+    assert "@error" in await interface.read("a")
+    assert await interface.read("a") == {}
+    assert await interface.read("a") == {"value": 1}
+    assert interface.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_callers_get_their_own_copy():
+    interface = FakeInterface([{"value": 1}])
+    first, second = await asyncio.gather(interface.read("a"), interface.read("a"))
+    first["ip"] = "10.0.0.1"
+    second["value"] = 2
+
+    assert await interface.read("a") == {"value": 1}
+    assert interface.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_results_are_pruned():
+    interface = FakeInterface([{"value": 1}, {"value": 2}])
+    await interface.read("a")
+    key, (expires, result) = next(iter(interface._single_flight_memo.items()))
+    interface._single_flight_memo[key] = (0.0, result)
+
+    await interface.read("b")
+    assert len(interface._single_flight_memo) == 1